@@ -0,0 +1,220 @@
+"""Module which contains AssetLoader class which loads (and scales and flips) all images of the game.
+
+Images are taken from the asset pack if it's built and up to date, otherwise they are decoded from source files.
+Asset pack is a single file with all images already transformed and stored as raw pixels in one atlas, so it's
+memory-mapped and images are created from it without any decoding. Build it (again after changing any image or
+scale of it in the code) with:
+    py build_asset_pack.py
+"""
+
+import os
+import json
+import mmap
+import struct
+from concurrent.futures import Executor, Future
+from hashlib import sha256
+from typing import Any, Iterable
+from weakref import WeakValueDictionary
+import pygame as pg
+from constants import ASSET_PACK_PATH, ASSET_PACK_ATLAS_WIDTH, GRAPHICS_FOLDER_PATH
+
+ImageKey = tuple[str, float, bool]  # (source path, scale, flip by x-axis)
+
+PACK_MAGIC: bytes = b"FLYRPACK"
+PACK_VERSION: int = 1  # increase it when format or the way images are transformed changes
+PACK_HEADER = struct.Struct("<8sII")  # magic, version, manifest size in bytes
+PACK_PIXELS_FORMAT: str = "BGRA"  # the same bytes order as surfaces after convert_alpha() have in memory
+PACK_PIXELS_ALIGNMENT: int = 64
+
+
+def get_image_sources(folder_path: str = GRAPHICS_FOLDER_PATH) -> list[str]:
+    """Returns paths (with "/" as separator like in the code) of all images in the folder (graphics one by default)"""
+    return sorted(
+        os.path.join(folder, file_name).replace(os.sep, "/")
+        for folder, _, file_names in os.walk(folder_path)
+        for file_name in file_names
+        if file_name.endswith(".png")
+    )
+
+
+def get_pixels_offset(manifest_size: int) -> int:
+    """Pixels start right after header and manifest, aligned to PACK_PIXELS_ALIGNMENT bytes"""
+    offset: int = PACK_HEADER.size + manifest_size
+    return offset + -offset % PACK_PIXELS_ALIGNMENT
+
+
+def get_file_hash(file_path: str) -> str:
+    with open(file_path, "rb") as file:
+        return sha256(file.read()).hexdigest()
+
+
+def get_source_info(file_path: str) -> dict[str, Any]:
+    """Returns info which is used to check that pack was built from the same source file"""
+    stat: os.stat_result = os.stat(file_path)
+    return {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns, "sha256": get_file_hash(file_path)}
+
+
+def is_source_unchanged(file_path: str, info: dict[str, Any]) -> bool:
+    try:
+        stat: os.stat_result = os.stat(file_path)
+    except OSError:
+        return False
+    if stat.st_size != info["size"]:
+        return False
+    # Hash is calculated only if modification time differs (for example after git checkout)
+    return stat.st_mtime_ns == info["mtime_ns"] or get_file_hash(file_path) == info["sha256"]
+
+
+class AssetPack:
+    """Memory-mapped asset pack file. Images are subsurfaces of one atlas surface which uses file's memory as pixels,
+    so nothing is decoded or copied and pages are shared with OS file cache until something draws on them"""
+
+    def __init__(self, file_path: str) -> None:
+        with open(file_path, "rb") as file:
+            # Copy-on-write mapping because surfaces need writable buffer (nothing is written to the file)
+            self.buffer: mmap.mmap = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_COPY)
+
+        magic, version, manifest_size = PACK_HEADER.unpack_from(self.buffer)
+        if magic != PACK_MAGIC or version != PACK_VERSION:
+            raise ValueError(f"{file_path} is not an asset pack of this version")
+        manifest: dict[str, Any] = json.loads(self.buffer[PACK_HEADER.size : PACK_HEADER.size + manifest_size])
+
+        atlas_width, atlas_height = manifest["atlas_size"]
+        pixels_offset: int = get_pixels_offset(manifest_size)
+        pixels = memoryview(self.buffer)[pixels_offset : pixels_offset + atlas_width * atlas_height * 4]
+        self.atlas: pg.Surface = pg.image.frombuffer(pixels, (atlas_width, atlas_height), PACK_PIXELS_FORMAT)
+
+        # Images of changed source files are not used (they are decoded from sources until pack is rebuilt)
+        self.sources: set[str] = {
+            source for source, info in manifest["sources"].items() if is_source_unchanged(source, info)
+        }
+        self.images_rects: dict[ImageKey, pg.Rect] = {
+            (image["path"], image["scale"], image["flip_x"]): pg.Rect(image["rect"])
+            for image in manifest["images"]
+            if image["path"] in self.sources
+        }
+
+    def get_image(self, key: ImageKey) -> pg.Surface | None:
+        rect: pg.Rect | None = self.images_rects.get(key)
+        return self.atlas.subsurface(rect) if rect is not None else None
+
+    @staticmethod
+    def write(file_path: str, images: dict[ImageKey, pg.Surface]) -> None:
+        """Pack all images in one atlas (shelf by shelf from the tallest ones) and write it with manifest to the file"""
+        atlas_width: int = max([ASSET_PACK_ATLAS_WIDTH] + [image.get_width() for image in images.values()])
+        images_rects: dict[ImageKey, pg.Rect] = {}
+        shelf_x, shelf_y, shelf_height = 0, 0, 0
+        for key, image in sorted(images.items(), key=lambda item: item[1].get_height(), reverse=True):
+            width, height = image.get_size()
+            if shelf_x + width > atlas_width:
+                shelf_x, shelf_y, shelf_height = 0, shelf_y + shelf_height, 0
+            images_rects[key] = pg.Rect(shelf_x, shelf_y, width, height)
+            shelf_x += width
+            shelf_height = max(shelf_height, height)
+
+        atlas: pg.Surface = pg.Surface((atlas_width, max(shelf_y + shelf_height, 1)), pg.SRCALPHA)
+        atlas.blits([(images[key], rect) for key, rect in images_rects.items()], doreturn=False)
+
+        manifest: bytes = json.dumps(
+            {
+                "atlas_size": atlas.get_size(),
+                "sources": {source: get_source_info(source) for source in sorted({key[0] for key in images})},
+                "images": [
+                    {"path": path, "scale": scale, "flip_x": flip_x, "rect": tuple(rect)}
+                    for (path, scale, flip_x), rect in images_rects.items()
+                ],
+            }
+        ).encode()
+
+        with open(file_path, "wb") as file:
+            file.write(PACK_HEADER.pack(PACK_MAGIC, PACK_VERSION, len(manifest)))
+            file.write(manifest)
+            file.write(bytes(get_pixels_offset(len(manifest)) - file.tell()))
+            file.write(pg.image.tobytes(atlas, PACK_PIXELS_FORMAT))
+
+
+class AssetLoader:
+    """Loads every image once: from asset pack if it has this image (with the same scale and flip) else from source"""
+
+    def __init__(self, pack_path: str = ASSET_PACK_PATH) -> None:
+        self.pack_path: str = pack_path
+        self.use_pack: bool = True
+        self.pack: AssetPack | None = None
+        self.pack_opened: bool = False
+        # Images are kept only while something uses them (so graphics of released states can be freed)
+        self.loaded_images: WeakValueDictionary[ImageKey, pg.Surface] = WeakValueDictionary()
+        self.images_to_pack: dict[ImageKey, pg.Surface] = {}  # all loaded images while pack is built
+        self.is_building_pack: bool = False
+        self.decoded_images_number: int = 0  # images which weren't in the pack
+        # normcase of source path -> decoded (not converted) image
+        self.preloaded_sources: dict[str, Future[pg.Surface]] = {}
+
+    def start_pack_building(self) -> None:
+        """Load images from source files and remember all of them to write them with build_pack()"""
+        self.use_pack = False
+        self.is_building_pack = True
+
+    def open_pack(self) -> None:
+        """Open asset pack if it exists (called on first loaded image, display must be already created)"""
+        self.pack_opened = True
+        if not self.use_pack or not os.path.exists(self.pack_path):
+            return
+        try:
+            self.pack = AssetPack(self.pack_path)
+        except (OSError, ValueError, KeyError, struct.error):
+            self.pack = None  # broken pack is ignored, images are decoded from sources
+
+    def preload_sources(self, executor: Executor, folders: Iterable[str]) -> list[Future[pg.Surface]]:
+        """Start decoding source images from these folders of graphics folder (only images of states which will be
+        prepared) which aren't in the asset pack with executor's worker threads.
+        load_image() waits for them and does only convert_alpha() and transformations (they need the main thread)"""
+        if not self.pack_opened:
+            self.open_pack()
+        for folder in folders:
+            for path in get_image_sources(f"{GRAPHICS_FOLDER_PATH}/{folder}"):
+                # Keys are compared like the file system does (file names' case doesn't matter on Windows)
+                source_key: str = os.path.normcase(path)
+                if (self.pack is None or path not in self.pack.sources) and source_key not in self.preloaded_sources:
+                    self.preloaded_sources[source_key] = executor.submit(pg.image.load, path)
+        return list(self.preloaded_sources.values())
+
+    def finish_preloading(self) -> None:
+        """Forget preloaded sources (images which weren't loaded yet will be decoded in load_image() again)"""
+        self.preloaded_sources = {}
+
+    def decode_image(self, path: str, scale: float, flip_x: bool) -> pg.Surface:
+        preloaded_source: Future[pg.Surface] | None = self.preloaded_sources.get(os.path.normcase(path))
+        source: pg.Surface = preloaded_source.result() if preloaded_source is not None else pg.image.load(path)
+        image: pg.Surface = source.convert_alpha()
+        if scale != 1:
+            image = pg.transform.rotozoom(image, 0, scale).convert_alpha()
+        if flip_x:
+            image = pg.transform.flip(image, True, False)
+        return image
+
+    def load_image(self, path: str, scale: float = 1, flip_x: bool = False) -> pg.Surface:
+        """Returns image from path scaled with rotozoom and flipped by x-axis if needed.
+        The same surface is returned for the same arguments, so it mustn't be changed by caller"""
+        key: ImageKey = (path, float(scale), flip_x)
+        image: pg.Surface | None = self.loaded_images.get(key)
+        if image is not None:
+            return image
+
+        if not self.pack_opened:
+            self.open_pack()
+        if self.pack is not None:
+            image = self.pack.get_image(key)
+        if image is None:
+            image = self.decode_image(*key)
+            self.decoded_images_number += 1
+        self.loaded_images[key] = image
+        if self.is_building_pack:
+            self.images_to_pack[key] = image
+        return image
+
+    def build_pack(self) -> None:
+        """Write all images loaded since start_pack_building() into the asset pack"""
+        AssetPack.write(self.pack_path, self.images_to_pack)
+
+
+asset_loader = AssetLoader()
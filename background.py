@@ -1,6 +1,7 @@
 """Contain GameBackground class which manage background in the game"""
 
 import pygame as pg
+from asset_loader import asset_loader
 from constants import GAME_SCREEN_WIDTH, BACKGROUND_SPEED
 
 
@@ -14,12 +15,10 @@ class BackgroundElement(pg.sprite.Sprite):
             to_reverse (bool): specify if we need to reverse this element by x-axis
         """
         super().__init__()
-        self.image: pg.Surface = pg.transform.rotozoom(
-            pg.image.load("assets/graphics/backgrounds/background.png").convert_alpha(), 0, 0.5
+        self.image: pg.Surface = asset_loader.load_image(
+            "assets/graphics/backgrounds/background.png", 0.5, flip_x=to_reverse
         )  # Make element 2 times smaller to fit the screen
         self.rect: pg.Rect = self.image.get_rect(topleft=(start_x, start_y))
-        if to_reverse:
-            self.image = pg.transform.flip(self.image, True, False)
 
     def move_to_start(self) -> None:
         self.rect.left = GAME_SCREEN_WIDTH
@@ -43,5 +42,8 @@ class GameBackground:
             el.slide_to_left()
             el.check_right()
 
-    def draw_background(self, screen: pg.Surface) -> None:
-        self.background_elements_group.draw(screen)
+    def draw_background(self, screen: pg.Surface, offset_x: int = 0) -> None:
+        if not offset_x:
+            self.background_elements_group.draw(screen)
+            return
+        screen.blits([(el.image, el.rect.move(offset_x, 0)) for el in self.background_elements_group], doreturn=False)
@@ -0,0 +1,297 @@
+"""Module which contains benchmark of the game loop on deterministic scenes
+
+Every scene (many enemies, bullets in flight, torpedo detonation, coin burst...) is built from the same seed on every
+run, then MainGameState.update(), check_collisions() and draw() (on offscreen surface) are timed for some frames.
+Control's startup (from importing the game to the first menu frame) is timed in new processes.
+Results are written to JSON file which can be used as a baseline for the next runs, for example:
+    py benchmark.py --output baseline.json
+    py benchmark.py --output current.json --baseline baseline.json --threshold 0.2
+The second command fails (exit code 1) if median time of something is more than 20% bigger than in the baseline
+"""
+
+import os
+
+# SDL reads these when pygame initializes video and audio, so they must be set before any game module is imported
+os.environ["SDL_VIDEODRIVER"] = "dummy"
+os.environ["SDL_AUDIODRIVER"] = "dummy"
+
+import gc
+import json
+import platform
+import subprocess
+import sys
+from argparse import SUPPRESS, ArgumentParser
+from random import randint
+from statistics import mean, median
+from time import perf_counter
+from typing import Callable
+import numpy as np
+import pygame as pg
+from constants import GAME_SCREEN_HEIGHT, GAME_SCREEN_WIDTH, PIXEL_PERFECT_COLLISIONS
+from input_control import PressedKeys
+from objects.flying_objects import Coin, ScoreStar
+from objects.planes import EnemyPlane
+from objects.torpedo import Torpedo
+from simulation import HeadlessSimulation
+from states.main_game_state import MainGameState
+
+Results = dict[str, dict[str, float]]  # "scene/measure" -> statistics of frame times in milliseconds
+
+
+def place_enemy(enemy: EnemyPlane, center: tuple[int, int]) -> None:
+    """Move enemy which has already flown into the screen, so it can shoot and be killed"""
+    enemy.rect.center = center
+    enemy.start_coor_y_top = enemy.rect.top
+    enemy.right_target_x = max(enemy.right_target_x, enemy.rect.right)
+    enemy.update_collide_rect()
+    enemy.change_immortality()
+
+
+def add_enemies(game: MainGameState, number: int) -> None:
+    for _ in range(number):
+        enemy = EnemyPlane()
+        place_enemy(
+            enemy, (randint(GAME_SCREEN_WIDTH // 2, GAME_SCREEN_WIDTH - 60), randint(40, GAME_SCREEN_HEIGHT - 40))
+        )
+        game.enemies_group.add(enemy)
+
+
+def add_bullets(game: MainGameState, number: int) -> None:
+    for _ in range(number // 2):
+        game.player_bullets.add(randint(0, GAME_SCREEN_WIDTH), randint(0, GAME_SCREEN_HEIGHT))
+        game.enemies_bullets.add(randint(0, GAME_SCREEN_WIDTH), randint(0, GAME_SCREEN_HEIGHT))
+
+
+def build_empty_scene(game: MainGameState) -> None:
+    pass
+
+
+def build_enemies_scene(game: MainGameState) -> None:
+    add_enemies(game, 40)
+
+
+def build_many_enemies_scene(game: MainGameState) -> None:
+    """Ten times more enemies than can be on the screen in the game"""
+    add_enemies(game, 250)
+
+
+def build_bullets_scene(game: MainGameState) -> None:
+    add_enemies(game, 10)
+    add_bullets(game, 400)
+
+
+def build_torpedo_detonation_scene(game: MainGameState) -> None:
+    """Torpedo explodes on the first frame among the group of enemies, the next frames play explosions"""
+    torpedo: Torpedo = Torpedo.acquire(*game.player_group.sprite.get_bullet_position())
+    torpedo.rect.centerx = torpedo.target_center_x - 1
+    game.torpedo_group.add(torpedo)
+    for _ in range(20):
+        enemy = EnemyPlane()
+        place_enemy(enemy, (torpedo.target_center_x + randint(-100, 100), torpedo.rect.centery + randint(-100, 100)))
+        game.enemies_group.add(enemy)
+
+
+def build_coin_burst_scene(game: MainGameState) -> None:
+    """Coins and stars right on the player, so all of them are collected on the first frame"""
+    player_x, player_y = game.player_group.sprite.collide_rect.center
+    for flying_object in [Coin() for _ in range(30)] + [ScoreStar() for _ in range(10)]:
+        flying_object.rect.center = (player_x + randint(-20, 20), player_y + randint(-10, 10))
+        flying_object.update_collide_rect()
+        (game.coins_group if isinstance(flying_object, Coin) else game.score_stars_group).add(flying_object)
+
+
+scenes: dict[str, Callable[[MainGameState], None]] = {
+    "empty": build_empty_scene,
+    "enemies_40": build_enemies_scene,
+    "enemies_250": build_many_enemies_scene,
+    "bullets_400": build_bullets_scene,
+    "torpedo_detonation": build_torpedo_detonation_scene,
+    "coin_burst": build_coin_burst_scene,
+}
+
+
+def get_statistics(times: list[float]) -> dict[str, float]:
+    """Returns statistics of times (in seconds) in milliseconds"""
+    return {
+        "median_ms": median(times) * 1000,
+        "mean_ms": mean(times) * 1000,
+        "p95_ms": float(np.percentile(times, 95)) * 1000,
+        "samples": len(times),
+    }
+
+
+class SceneBenchmark:
+    """Builds scenes in the same game state (graphics are loaded once) and times its update, collisions and draw"""
+
+    def __init__(
+        self, seed: int, frames: int, repeats: int, pixel_perfect_collisions: bool = PIXEL_PERFECT_COLLISIONS
+    ) -> None:
+        self.simulation = HeadlessSimulation(seed, pixel_perfect_collisions=pixel_perfect_collisions)
+        self.game: MainGameState = self.simulation.game
+        self.seed: int = seed
+        self.frames: int = frames
+        self.repeats: int = repeats
+        self.surface: pg.Surface = pg.Surface((GAME_SCREEN_WIDTH, GAME_SCREEN_HEIGHT)).convert()
+
+    def build_scene(self, scene_name: str) -> None:
+        self.simulation.reset(self.seed)
+        scenes[scene_name](self.game)
+        self.game.renderer.invalidate()
+
+    def run_scene(self, scene_name: str) -> Results:
+        """Every repeat builds the scene again and runs it for self.frames frames (the first repeat isn't counted,
+        so pools and caches are filled)"""
+        times: dict[str, list[float]] = {"update": [], "check_collisions": [], "draw": []}
+        update_functions: list[tuple[str, Callable[[], None]]] = self.game.update_phases
+        keys = PressedKeys()
+        for repeat in range(self.repeats + 1):
+            self.build_scene(scene_name)
+            gc.collect()
+            gc.disable()  # garbage collection at random moments makes results noisy
+            try:
+                for _ in range(self.frames):
+                    self.game.get_keys(keys)
+                    collisions_time: float = 0.0
+                    start_time: float = perf_counter()
+                    # The same as self.game.update() but check_collisions() is timed too
+                    for name, function in update_functions:
+                        if name == "collisions":
+                            collisions_start_time: float = perf_counter()
+                            function()
+                            collisions_time = perf_counter() - collisions_start_time
+                        else:
+                            function()
+                    update_time: float = perf_counter() - start_time
+
+                    start_time = perf_counter()
+                    self.game.draw(self.surface)
+                    draw_time: float = perf_counter() - start_time
+                    if repeat:
+                        times["update"].append(update_time)
+                        times["check_collisions"].append(collisions_time)
+                        times["draw"].append(draw_time)
+            finally:
+                gc.enable()
+        return {f"{scene_name}/{measure}": get_statistics(measure_times) for measure, measure_times in times.items()}
+
+
+def run_startup() -> None:
+    """Start the game in this process and print seconds from importing it until the menu is drawn"""
+    start_time: float = perf_counter()
+    from control import Control
+
+    control = Control()
+    while control.state_name != "menu":
+        control.event_loop()
+        control.update()
+        control.state.draw(control.screen)
+        pg.display.update()
+    print(perf_counter() - start_time)
+
+
+def measure_startup(runs: int) -> Results:
+    """Time Control's startup in new processes (so nothing is loaded or cached yet)"""
+    times: list[float] = []
+    for _ in range(runs):
+        process: subprocess.CompletedProcess = subprocess.run(
+            [sys.executable, os.path.abspath(__file__), "--startup-run"],
+            capture_output=True,
+            text=True,
+            check=True,
+            cwd=os.path.dirname(os.path.abspath(__file__)),
+        )
+        times.append(float(process.stdout.split()[-1]))
+    return {"control/startup": get_statistics(times)}
+
+
+def compare_with_baseline(
+    results: Results, baseline: Results, threshold: float, minimum_difference_ms: float
+) -> list[str]:
+    """Print comparison of median times and returns names of results which got slower more than threshold (and more
+    than minimum_difference_ms, so timer noise of very fast measures isn't reported)"""
+    regressions: list[str] = []
+    for name, statistics in results.items():
+        if name not in baseline:
+            print(f"{name:<38}{statistics['median_ms']:>10.3f} ms  (not in baseline)")
+            continue
+        baseline_median: float = baseline[name]["median_ms"]
+        change: float = statistics["median_ms"] / baseline_median - 1 if baseline_median else 0.0
+        is_regression: bool = change > threshold and statistics["median_ms"] - baseline_median > minimum_difference_ms
+        if is_regression:
+            regressions.append(name)
+        print(
+            f"{name:<38}{statistics['median_ms']:>10.3f} ms  baseline {baseline_median:>10.3f} ms  {change:>+8.1%}"
+            + ("  REGRESSION" if is_regression else "")
+        )
+    return regressions
+
+
+def main() -> None:
+    parser = ArgumentParser(description="Time game loop on deterministic scenes and compare it with a baseline")
+    parser.add_argument("--seed", type=int, default=0, help="seed the scenes are built with")
+    parser.add_argument("--frames", type=int, default=120, help="frames to run every scene for in one repeat")
+    parser.add_argument("--repeats", type=int, default=5, help="how many times every scene is built and run")
+    parser.add_argument("--scenes", nargs="+", choices=list(scenes), default=list(scenes), help="scenes to run")
+    parser.add_argument("--startup-runs", type=int, default=3, help="game startups to time (0 to skip)")
+    parser.add_argument("--output", help="JSON file to write results to (it can be used as a baseline later)")
+    parser.add_argument("--baseline", help="JSON file with results of an earlier run to compare with")
+    parser.add_argument("--threshold", type=float, default=0.2, help="median slowdown which is a regression (0.2=20%%)")
+    parser.add_argument(
+        "--min-difference", type=float, default=0.05, help="smallest slowdown in ms which is a regression"
+    )
+    parser.add_argument(
+        "--pixel-perfect-collisions",
+        action="store_true",
+        default=PIXEL_PERFECT_COLLISIONS,
+        help="check hits by images' pixels instead of collide rects",
+    )
+    parser.add_argument("--startup-run", action="store_true", help=SUPPRESS)
+    args = parser.parse_args()
+
+    if args.startup_run:
+        run_startup()
+        return
+
+    scene_benchmark = SceneBenchmark(args.seed, args.frames, args.repeats, args.pixel_perfect_collisions)
+    results: Results = {}
+    for scene_name in args.scenes:
+        results.update(scene_benchmark.run_scene(scene_name))
+    if args.startup_runs:
+        results.update(measure_startup(args.startup_runs))
+
+    report: dict = {
+        "environment": {
+            "python": platform.python_version(),
+            "pygame": pg.version.ver,
+            "numpy": np.__version__,
+            "platform": platform.platform(),
+        },
+        "settings": {
+            "seed": args.seed,
+            "frames": args.frames,
+            "repeats": args.repeats,
+            "pixel_perfect_collisions": args.pixel_perfect_collisions,
+        },
+        "results": results,
+    }
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as output_file:
+            json.dump(report, output_file, indent=2)
+
+    if args.baseline:
+        with open(args.baseline, "r", encoding="utf-8") as baseline_file:
+            baseline: Results = json.load(baseline_file)["results"]
+        regressions: list[str] = compare_with_baseline(results, baseline, args.threshold, args.min_difference)
+        if regressions:
+            print(f"{len(regressions)} regression(s) over {args.threshold:.0%}: {', '.join(regressions)}")
+            sys.exit(1)
+    else:
+        for name, statistics in results.items():
+            print(
+                f"{name:<38}median {statistics['median_ms']:>9.3f} ms  mean {statistics['mean_ms']:>9.3f} ms  "
+                f"p95 {statistics['p95_ms']:>9.3f} ms"
+            )
+
+
+if __name__ == "__main__":
+    main()
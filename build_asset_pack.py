@@ -0,0 +1,29 @@
+"""Script which builds asset pack with all images of the game (run it after changing any image or its scale):
+py build_asset_pack.py
+"""
+
+import os
+
+# The game is created only to load all its images, so it doesn't need window and audio
+os.environ["SDL_VIDEODRIVER"] = "dummy"
+os.environ["SDL_AUDIODRIVER"] = "dummy"
+
+from asset_loader import asset_loader
+from control import Control
+
+
+def main() -> None:
+    # Creating every state loads all images through asset_loader, so all of them can be written into the pack after that
+    asset_loader.start_pack_building()
+    control = Control()
+    for state_name in control.state_classes:
+        control.get_state(state_name)
+    asset_loader.build_pack()
+    images: dict = asset_loader.images_to_pack
+    print(
+        f"{len(images)} images from {len({key[0] for key in images})} files were written into {asset_loader.pack_path}"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,39 @@
+"""Module which contains CachedFont class which keeps rendered texts, so repeated ones aren't rasterized again"""
+
+from collections import OrderedDict
+import pygame as pg
+from constants import TEXT_CACHE_SIZE
+
+Color = str | tuple[int, int, int]
+
+
+class CachedFont(pg.font.Font):
+    """Font which keeps the last TEXT_CACHE_SIZE rendered texts. HUD's values (coins, score, reload time) are drawn
+    many times before they change and often return to the same values, so most of draws don't rasterize text"""
+
+    def __init__(self, font_path: str, size: int) -> None:
+        super().__init__(font_path, size)
+        self.texts_cache: OrderedDict[tuple[str, bool, Color], pg.Surface] = OrderedDict()  # from least recently used
+
+    def render(self, text: str, antialias: bool, color: Color) -> pg.Surface:
+        """The same as pg.font.Font.render without background, but returned surface is shared (don't change it)"""
+        key: tuple[str, bool, Color] = (text, antialias, color)
+        text_surf: pg.Surface | None = self.texts_cache.get(key)
+        if text_surf is None:
+            text_surf = super().render(text, antialias, color)
+            self.texts_cache[key] = text_surf
+            if len(self.texts_cache) > TEXT_CACHE_SIZE:
+                self.texts_cache.popitem(last=False)
+        else:
+            self.texts_cache.move_to_end(key)
+        return text_surf
+
+
+cached_fonts: dict[tuple[str, int], CachedFont] = {}  # (font path, size) -> font shared by all objects
+
+
+def get_cached_font(font_path: str, size: int) -> CachedFont:
+    """Returns font of this size (it's loaded only on the first call)"""
+    if (font_path, size) not in cached_fonts:
+        cached_fonts[(font_path, size)] = CachedFont(font_path, size)
+    return cached_fonts[(font_path, size)]
@@ -0,0 +1,35 @@
+"""Module which contains CollisionMasks class (masks of images for pixel-perfect collisions)"""
+
+from typing import Iterable
+import pygame as pg
+
+
+class CollisionMasks:
+    """Masks of all images which can collide. They are made once when graphics are loaded (for every animation
+    frame and every flipped or rotated variant, because all of them are separate images), so collision checks only
+    look mask of sprite's current image up"""
+
+    def __init__(self) -> None:
+        self.masks: dict[pg.Surface, pg.mask.Mask] = {}  # image -> its mask
+
+    def add(self, images: Iterable[pg.Surface]) -> None:
+        for image in images:
+            if image not in self.masks:
+                self.masks[image] = pg.mask.from_surface(image)
+
+    def clear(self) -> None:
+        self.masks.clear()
+
+    def overlap(
+        self, image: pg.Surface, position: tuple[int, int], other_image: pg.Surface, other_position: tuple[int, int]
+    ) -> bool:
+        """Returns True if images drawn with top-left at these positions have overlapping opaque pixels"""
+        return (
+            self.masks[image].overlap(
+                self.masks[other_image], (other_position[0] - position[0], other_position[1] - position[1])
+            )
+            is not None
+        )
+
+
+collision_masks = CollisionMasks()
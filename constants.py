@@ -1,10 +1,15 @@
 """Module which store all constants (and parameters that you can change as settings)"""
 
-# Games FPS (clock.time())
+# Games FPS (simulation ticks per second, all speeds, timers and reloads are counted in these ticks)
 from os import getcwd
 
 
 FPS: int = 60
+RENDER_FPS: int = 144  # maximum number of frames drawn per second (0 - no limit), it doesn't change game's speed
+MAX_UPDATES_PER_FRAME: int = 5  # if the game falls behind it catches up with at most this number of ticks per frame
+MAX_SKIPPED_FRAMES: int = 2  # drawing of at most this number of frames in a row is skipped while game catches up
+RENDER_INTERPOLATION: bool = True  # draw moving objects between their positions in the last two ticks
+INTERPOLATION_MAX_DISTANCE: int = 120  # px, objects moved farther in one tick (teleported) aren't interpolated
 
 # Window sizes (please don't change, some positions and sizes of objects in game are hardcoded and so will break if size will be changed)
 GAME_SCREEN_WIDTH: int = 1413
@@ -36,10 +41,38 @@ FLYING_HEART_SPAWN_EVENT_CHANCE_DENOMINATOR: int = 2
 # Music volume
 MENU_MUSIC_VOLUME: float = 0.2
 GAMEPLAY_MUSIC_VOLUME: float = 0.2
+MUSIC_FADE_TIME: int = 600  # milliseconds to fade out old music and fade in new one (0 to change music instantly)
 
 # Game background
 BACKGROUND_SPEED = 2  # px per frame
 
+# Assets
+GRAPHICS_FOLDER_PATH: str = "assets/graphics"
+LOADING_WORKERS: int = 4  # threads which decode images and sounds while loading screen is shown
+ASSET_PACK_PATH: str = "assets/asset_pack.bin"  # built with "py build_asset_pack.py", images are decoded if it's missing
+ASSET_PACK_ATLAS_WIDTH: int = 2048  # px (minimal width of the atlas in asset pack)
+
+# States
+# Free graphics of states which aren't in use (they're loaded again on the next transition to them)
+RELEASE_UNUSED_STATES: bool = False
+PRINT_RESOURCES_REPORT: bool = False  # print time to the first menu frame and memory used after every state change
+
+# Frame profiler (shown in the game with F3 key)
+PROFILER_WINDOW_FRAMES: int = 120  # phases' times are averaged over this number of last frames
+PROFILER_OVERLAY_UPDATE_FRAMES: int = 15  # overlay's text is rendered again every this number of frames
+
+# Text
+TEXT_CACHE_SIZE: int = 128  # last rendered texts kept for every font and size (they're drawn again without rendering)
+
+# Rendering
+# Redraw only changed parts of the screen in the game (for slow machines). Background doesn't scroll in this mode
+DIRTY_RECT_RENDERING: bool = False
+
+# Frame export (every drawn frame is published to shared memory for external tools, read it with frame_exporter.py)
+EXPORT_FRAMES: bool = False
+FRAME_EXPORT_NAME: str = "fly_rush_frames"  # name of the shared memory block
+FRAME_EXPORT_SLOTS: int = 3  # frames in the ring, reader has (slots - 1) frames of time to copy the latest one
+
 # Player
 PLAYER_SPEED_Y: int = 8  # px per frame
 PLAYER_SPEED_X_RIGHT: int = 10  # px per frame
@@ -60,8 +93,14 @@ ENEMY_BULLET_SPEED: int = 12  # px per frame
 ENEMY_RELOAD_RANGE: tuple[int, int] = (90, 180)  # (minimum, maximum) frames until EnemyPlane can shoot again
 ENEMY_SCORE_RANGE: tuple[int, int] = (4, 16)  # (minimum, maximum) score player will get for killing enemy
 
+# Collisions
+SPATIAL_HASH_CELL_SIZE: int = 128  # px (side of one cell of the grid which is used to find enemies near some rect)
+# Hits are checked by images' opaque pixels (their rects only find candidates) instead of hardcoded collide rects
+PIXEL_PERFECT_COLLISIONS: bool = False
+
 # Explosions
 PLANE_EXPLOSION_SIZE_COEFFICIENT: float = 0.35  # value which set the size of explosion animation
+EXPLOSION_FRAMES_CACHE_SIZE: int = 8  # how many explosion sizes keep their scaled frames (least recently used removed)
 
 # Coins
 # For coin there's (NUMBER OF THIS COIN) / (SUM OF ALL NUMBERS) chance that this coin will be spawned
@@ -91,8 +130,22 @@ FLYING_HEART_SPEED_X: int = 4  # px per frame
 # Data saving
 ABSOLUTE_DATA_FOLDER_PATH: str = getcwd()  # path to folder which will contain data folder
 DATA_FOLDER_NAME: str = "data_folder"
-DATA_FILE_EXTENSION: str = ".data"
+DATA_FILE_NAME: str = "game_data.json"  # all data is saved in this file
+DATA_FILE_EXTENSION: str = ".data"  # old versions saved every entry in its own file with this extension
 BEST_SCORE_FILE_NAME: str = "record"
+SAVE_FLUSH_TIMEOUT: float = 5.0  # seconds the game waits for background saves when it is closed
+
+# Replays (every gameplay session is recorded as seed and player's input, play them with replay.py)
+RECORD_REPLAYS: bool = True
+REPLAYS_FOLDER_NAME: str = "replays"  # folder in the data folder
+REPLAYS_TO_KEEP: int = 20  # older replays are deleted
+REPLAY_KEYFRAME_INTERVAL: int = 300  # ticks between game state checksums (and snapshots for seeking in playback)
+
+# Environment for bots (game_env.py)
+ENV_OBSERVED_ENEMIES: int = 8  # how many nearest enemies are in observation
+ENV_OBSERVED_BULLETS: int = 16  # how many nearest enemies' bullets are in observation
+ENV_OBSERVED_ITEMS: int = 6  # how many nearest coins, score stars and flying hearts are in observation
+ENV_MAX_EPISODE_TICKS: int = FPS * 600  # episode is cut (done) after this number of ticks
 
 # Torpedo
 TORPEDO_TIME_RELOAD: int = 1800  # This value divided by FPS is seconds for reload
@@ -1,75 +1,210 @@
 """Module which contain Control class which controls everything in game (states)"""
 
+from concurrent.futures import Future, ThreadPoolExecutor
+from functools import partial
+from time import perf_counter
 import pygame as pg
-from constants import FPS, GAME_SCREEN_HEIGHT, GAME_SCREEN_WIDTH
+from asset_loader import asset_loader
+from frame_exporter import FrameExporter
+from frame_profiler import frame_profiler
+from input_control import input_controller
+from constants import (
+    EXPORT_FRAMES,
+    FPS,
+    GAME_SCREEN_HEIGHT,
+    GAME_SCREEN_WIDTH,
+    LOADING_WORKERS,
+    MAX_SKIPPED_FRAMES,
+    MAX_UPDATES_PER_FRAME,
+    PRINT_RESOURCES_REPORT,
+    RELEASE_UNUSED_STATES,
+    RENDER_FPS,
+    SAVE_FLUSH_TIMEOUT,
+)
+from memory_usage import get_resident_memory
+from save_load_system import save_load_system
+from sounds_and_music_control import audio_controller
 from states.base_state import State
 from states.main_game_state import MainGameState
 from states.menu_state import MenuState
 from states.pause_state import PauseState
 from states.game_over_state import GameOverState
+from states.loading_state import LoadingState
 
 
 class Control:
+    state_classes: dict[str, type[State]] = {
+        "gameplay": MainGameState,
+        "menu": MenuState,
+        "pause": PauseState,
+        "game_over": GameOverState,
+    }
+
     def __init__(self) -> None:
+        self.start_time: float = perf_counter()
+        self.first_frame_time: float | None = None  # seconds from start to the first shown frame (loading screen)
+        self.menu_frame_time: float | None = None  # seconds from start to the first shown frame of the menu
         pg.init()
 
         # Setting up game's screen
         self.screen: pg.Surface = pg.display.set_mode((GAME_SCREEN_WIDTH, GAME_SCREEN_HEIGHT))
-        icon: pg.Surface = pg.transform.scale(
-            pg.image.load("assets/graphics/icons/main_icon.png").convert_alpha(), (64, 64)
-        )
+        icon: pg.Surface = pg.transform.scale(asset_loader.load_image("assets/graphics/icons/main_icon.png"), (64, 64))
         pg.display.set_icon(icon)
         pg.display.set_caption("Fly RUSH!")
+        input_controller.block_unused_events()
+        input_controller.load_bindings()
+        # Drawn frames are published to shared memory for external tools (stream overlay, bots...)
+        self.frame_exporter: FrameExporter | None = FrameExporter(self.screen) if EXPORT_FRAMES else None
 
-        self.state_dict: dict[str, State] = {
-            "gameplay": MainGameState(),
-            "menu": MenuState(),
-            "pause": PauseState(),
-            "game_over": GameOverState(),
-        }
-        self.state_name: str = "menu"
-        self.state: State = self.state_dict[self.state_name]
-        # load graphics
-        for state in self.state_dict.values():
-            state.load_graphics()
-        self.state_dict["menu"].setup_rects_and_buttons()
-        self.state_dict["pause"].setup_rects_and_buttons()
-        self.state_dict["game_over"].setup_rects_and_buttons()
-        self.state_dict["gameplay"].setup_rects_and_objects()
+        # States are created (and their graphics are loaded) on the first transition to them
+        self.state_dict: dict[str, State] = {}
+        # Images and sounds are decoded in worker threads while loading state is shown, then states which will be
+        # needed are set up in the main thread (all of them if unused states aren't released)
+        self.loading_executor = ThreadPoolExecutor(max_workers=LOADING_WORKERS)
+        states_to_prepare: list[str] = ["menu"] if RELEASE_UNUSED_STATES else list(self.state_classes)
+        loading_tasks: list[Future] = asset_loader.preload_sources(
+            self.loading_executor,
+            [folder for state_name in states_to_prepare for folder in self.state_classes[state_name].graphics_folders],
+        )
+        loading_tasks += audio_controller.load_sounds(self.loading_executor)
+        self.state_name: str = "loading"
+        self.state: State = LoadingState(
+            loading_tasks,
+            [partial(self.get_state, state_name) for state_name in states_to_prepare] + [self.finish_loading],
+            "menu",
+        )
         self.state.startup()
 
         self.done = False
         self.clock = pg.time.Clock()
+        # The game is updated with fixed ticks (FPS per second) independently of how often frames are drawn
+        self.tick_time: float = 1 / FPS  # seconds
+        self.lag: float = 0.0  # seconds of game time which wasn't simulated yet (less than tick_time after catch-up)
+        self.skipped_frames: int = 0  # frames in a row which weren't drawn because the game fell behind
+
+    def get_state(self, state_name: str) -> State:
+        """Returns state with this name, creating it if it wasn't created yet or was released"""
+        if state_name not in self.state_dict:
+            state: State = self.state_classes[state_name]()
+            state.setup()
+            self.state_dict[state_name] = state
+        return self.state_dict[state_name]
+
+    def finish_loading(self) -> None:
+        asset_loader.finish_preloading()
+        self.loading_executor.shutdown()
+
+    def release_unused_states(self) -> None:
+        """Remove all states except the current one (and the one it returns to) so their graphics can be freed"""
+        needed_states: set[str] = {self.state_name}
+        if self.state.resumes_previous:
+            needed_states.add(self.state.previous)
+        for state_name in list(self.state_dict):
+            if state_name not in needed_states:
+                self.state_dict.pop(state_name).release()
+
+    def report_resources(self, moment: str) -> None:
+        resident_memory: int | None = get_resident_memory()
+        memory: str = f"{resident_memory / 2**20:.1f} MB" if resident_memory is not None else "unknown"
+        save_stats: dict[str, float] = save_load_system.get_stats()
+        print(
+            f"[{perf_counter() - self.start_time:.3f} s] {moment}: resident memory {memory}, "
+            f"created states: {', '.join(self.state_dict)}, saves queued: {save_stats['queue_depth']}, "
+            f"written: {save_stats['writes']} (average {save_stats['average_write_ms']:.1f} ms, "
+            f"max {save_stats['max_write_ms']:.1f} ms)"
+        )
 
     def flip_state(self) -> None:
         self.state.done = False
         previous, self.state_name = self.state_name, self.state.next
         self.state.cleanup()
-        self.state = self.state_dict[self.state_name]
+        self.state = self.get_state(self.state_name)
         self.state.previous = previous
         self.state.startup()
+        if RELEASE_UNUSED_STATES:
+            self.release_unused_states()
+        if PRINT_RESOURCES_REPORT:
+            self.report_resources(f"{previous} -> {self.state_name}")
 
     def update(self) -> None:
-        keys: pg.key.ScancodeWrapper = pg.key.get_pressed()
-        self.state.get_keys(keys)
+        self.state.get_keys(input_controller.keys)  # snapshot taken in event_loop
         if self.state.quit:
             self.done = True
         elif self.state.done:
             self.flip_state()
         self.state.update()
+        audio_controller.update()
 
     def event_loop(self) -> None:
-        for event in pg.event.get():
+        for event in input_controller.get_events():
             if event.type == pg.QUIT:
-                self.state_dict["gameplay"].update_record()
+                if "gameplay" in self.state_dict:
+                    self.state_dict["gameplay"].update_record()
+                    self.state_dict["gameplay"].save_replay()
                 self.done = True
             self.state.get_event(event)
 
+    def update_display(self) -> None:
+        if self.state.dirty_rects is None:
+            pg.display.update()
+        else:
+            pg.display.update(self.state.dirty_rects)
+
+    def run_updates(self) -> bool:
+        """Update the game for every whole tick of the lag (at most MAX_UPDATES_PER_FRAME ticks).
+        Returns False if the frame shouldn't be drawn because the game is still behind"""
+        updates_number: int = 0
+        while self.lag >= self.tick_time and updates_number < MAX_UPDATES_PER_FRAME and not self.done:
+            self.update()
+            self.lag -= self.tick_time
+            updates_number += 1
+        if self.lag < self.tick_time:
+            self.skipped_frames = 0
+            return True
+        if self.skipped_frames < MAX_SKIPPED_FRAMES:
+            self.skipped_frames += 1
+            return False
+        # Catch-up is bounded: time which couldn't be simulated is dropped, so the game slows down instead
+        self.lag %= self.tick_time
+        self.skipped_frames = 0
+        return True
+
     def main_game_loop(self) -> None:
+        previous_time: float = perf_counter()
+        self.lag = self.tick_time  # the first frame is drawn after one update
         while not self.done:
             self.event_loop()
-            self.update()
+            current_time: float = perf_counter()
+            self.lag += current_time - previous_time
+            previous_time = current_time
+            if not self.run_updates() or self.done:
+                continue
+
+            self.state.render_alpha = self.lag / self.tick_time
             self.state.draw(self.screen)
 
-            self.clock.tick(FPS)
-            pg.display.update()
+            if frame_profiler.enabled:
+                frame_profiler.run_phase("clock tick (sleep)", self.clock.tick, RENDER_FPS)
+                frame_profiler.run_phase("display update", self.update_display)
+                if self.frame_exporter is not None:
+                    frame_profiler.run_phase("frame export", self.frame_exporter.publish, self.screen)
+                frame_profiler.end_frame()
+            else:
+                self.clock.tick(RENDER_FPS)
+                self.update_display()
+                if self.frame_exporter is not None:
+                    self.frame_exporter.publish(self.screen)
+
+            if self.first_frame_time is None:
+                self.first_frame_time = perf_counter() - self.start_time
+                if PRINT_RESOURCES_REPORT:
+                    self.report_resources(f"first (loading screen) frame in {self.first_frame_time * 1000:.0f} ms")
+            if self.menu_frame_time is None and self.state_name == "menu":
+                self.menu_frame_time = perf_counter() - self.start_time
+                if PRINT_RESOURCES_REPORT:
+                    self.report_resources(f"first menu frame in {self.menu_frame_time * 1000:.0f} ms")
+
+        # Data saved in background must be written before the game is closed (but the game mustn't hang on it)
+        save_load_system.flush(SAVE_FLUSH_TIMEOUT)
+        if self.frame_exporter is not None:
+            self.frame_exporter.close()
@@ -0,0 +1,38 @@
+"""Module which contains EventScheduler class (queue of game events which are due at some tick of the simulation)"""
+
+import heapq
+from typing import Iterator
+
+
+class EventScheduler:
+    """Min-heap of events keyed on the tick they are due at, so every tick touches only events which are due
+    instead of counting down timers of all of them. Events due at the same tick are popped in order of their
+    (priority, order), both are chosen by the one who schedules event"""
+
+    def __init__(self) -> None:
+        self.tick: int = 0  # number of the current tick (0 until the first one)
+        self.queue: list[tuple[int, int, int, str]] = []  # heap of (due tick, priority, order, event)
+        self.orders_number: int = 0  # how many orders next_order() has given
+
+    def reset(self) -> None:
+        self.tick = 0
+        self.queue.clear()
+        self.orders_number = 0
+
+    def next_order(self) -> int:
+        """Returns number which is bigger than all previous ones (for events which must keep order of creation)"""
+        self.orders_number += 1
+        return self.orders_number
+
+    def schedule(self, due_tick: int, event: str, priority: int = 0, order: int = 0) -> None:
+        heapq.heappush(self.queue, (due_tick, priority, order, event))
+
+    def advance(self) -> None:
+        self.tick += 1
+
+    def pop_due(self) -> Iterator[tuple[str, int]]:
+        """Yields (event, order) of every event due at the current tick (or earlier). Events scheduled for the
+        current tick while iterating are yielded too"""
+        while self.queue and self.queue[0][0] <= self.tick:
+            _, _, order, event = heapq.heappop(self.queue)
+            yield event, order
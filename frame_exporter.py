@@ -0,0 +1,173 @@
+"""Module which contains FrameExporter class (publishes every drawn frame to shared memory ring for external tools)
+and FrameReader class to read the latest frame from it in another process
+
+Run it as a script (while the game with EXPORT_FRAMES is running) to check reading, for example:
+    py frame_exporter.py --seconds 10 --save last_frame.png
+"""
+
+import os
+import struct
+from argparse import ArgumentParser
+from multiprocessing import resource_tracker
+from multiprocessing.shared_memory import SharedMemory
+from time import perf_counter, sleep
+from typing import Any
+import numpy as np
+import pygame as pg
+from constants import FRAME_EXPORT_NAME, FRAME_EXPORT_SLOTS
+
+FRAMES_MAGIC: bytes = b"FLYRFRMS"
+FRAMES_VERSION: int = 1
+# magic, version, slots, width, height, pitch, bytes per pixel, shifts of red, green and blue
+FRAMES_HEADER: struct.Struct = struct.Struct("<8sHHIIIBBBB")
+COUNTERS_OFFSET: int = 32  # after the header: sequence of the latest frame, then sequence of the frame in every slot
+DATA_ALIGNMENT: int = 64
+
+
+class FrameExportError(Exception):
+    pass
+
+
+def get_layout(slots: int, height: int, pitch: int) -> tuple[int, int]:
+    """Returns offset of the first slot's pixels and size of the whole block"""
+    counters_end: int = COUNTERS_OFFSET + (slots + 1) * np.dtype(np.uint64).itemsize
+    data_offset: int = -(-counters_end // DATA_ALIGNMENT) * DATA_ALIGNMENT
+    return data_offset, data_offset + slots * height * pitch
+
+
+class FrameExporter:
+    """Ring of the last frames in shared memory. Frame n (from 1) is copied to slot n % slots right from the screen's
+    pixels (one memcpy, no Python objects per pixel), and its sequence is stored for the slot after the copy and as
+    the latest one after that. The game never waits for readers: they check that slot's sequence didn't change
+    while they copied it (like seqlock) and try again with the new latest frame if it did"""
+
+    def __init__(self, screen: pg.Surface, name: str = FRAME_EXPORT_NAME, slots: int = FRAME_EXPORT_SLOTS) -> None:
+        self.width, self.height = screen.get_size()
+        self.pitch: int = screen.get_pitch()
+        self.slots: int = slots
+        data_offset, size = get_layout(slots, self.height, self.pitch)
+        try:
+            self.memory = SharedMemory(name, create=True, size=size)
+        except FileExistsError:  # left by the game which wasn't closed properly
+            stale_memory = SharedMemory(name)
+            stale_memory.close()
+            stale_memory.unlink()
+            self.memory = SharedMemory(name, create=True, size=size)
+
+        FRAMES_HEADER.pack_into(
+            self.memory.buf,
+            0,
+            FRAMES_MAGIC,
+            FRAMES_VERSION,
+            slots,
+            self.width,
+            self.height,
+            self.pitch,
+            screen.get_bytesize(),
+            *screen.get_shifts()[:3],
+        )
+        self.counters: np.ndarray = np.ndarray((slots + 1,), np.uint64, self.memory.buf, COUNTERS_OFFSET)
+        self.counters[:] = 0
+        self.frames: np.ndarray = np.ndarray((slots, self.height, self.pitch), np.uint8, self.memory.buf, data_offset)
+        self.sequence: int = 0  # sequence of the last published frame
+
+    def publish(self, screen: pg.Surface) -> None:
+        self.sequence += 1
+        slot: int = self.sequence % self.slots
+        self.counters[slot + 1] = 0  # slot is being written
+        # Surface is locked only while its buffer is used
+        pixels: np.ndarray = np.frombuffer(screen.get_buffer(), np.uint8, self.height * self.pitch)
+        np.copyto(self.frames[slot], pixels.reshape(self.height, self.pitch))
+        del pixels
+        self.counters[slot + 1] = self.sequence
+        self.counters[0] = self.sequence
+
+    def close(self) -> None:
+        del self.counters, self.frames  # views must be released before the block is closed
+        self.memory.close()
+        self.memory.unlink()
+
+
+class FrameReader:
+    """Attaches to frames published by FrameExporter (in the game's process) and copies the latest one"""
+
+    def __init__(self, name: str = FRAME_EXPORT_NAME) -> None:
+        self.memory = SharedMemory(name)
+        if os.name == "posix":
+            # Otherwise resource tracker of this process would remove the block when this process exits
+            resource_tracker.unregister(self.memory._name, "shared_memory")  # type: ignore[attr-defined]
+        magic, version, self.slots, self.width, self.height, self.pitch, self.bytesize, *self.shifts = (
+            FRAMES_HEADER.unpack_from(self.memory.buf)
+        )
+        if magic != FRAMES_MAGIC:
+            self.memory.close()
+            raise FrameExportError(f"{name} isn't a block of exported frames")
+        if version != FRAMES_VERSION:
+            self.memory.close()
+            raise FrameExportError(f"unsupported version of exported frames: {version}")
+        data_offset, _ = get_layout(self.slots, self.height, self.pitch)
+        self.counters: np.ndarray = np.ndarray((self.slots + 1,), np.uint64, self.memory.buf, COUNTERS_OFFSET)
+        self.frames: np.ndarray = np.ndarray(
+            (self.slots, self.height, self.pitch), np.uint8, self.memory.buf, data_offset
+        )
+        self.frame: np.ndarray = np.zeros((self.height, self.pitch), np.uint8)  # the last copied frame
+
+    def get_latest_sequence(self) -> int:
+        return int(self.counters[0])
+
+    def read_latest(self) -> int:
+        """Copy the latest frame to self.frame and returns its sequence (0 if nothing was published yet)"""
+        while True:
+            sequence: int = int(self.counters[0])
+            if sequence == 0:
+                return 0
+            slot: int = sequence % self.slots
+            if self.counters[slot + 1] != sequence:  # the game already writes the next frame to this slot
+                continue
+            np.copyto(self.frame, self.frames[slot])
+            if self.counters[slot + 1] == sequence:
+                return sequence
+
+    def get_rgb(self) -> np.ndarray:
+        """Returns the last copied frame as (height, width, 3) array of red, green and blue"""
+        pixels: np.ndarray = self.frame[:, : self.width * self.bytesize].reshape(self.height, self.width, self.bytesize)
+        return pixels[:, :, [shift // 8 for shift in self.shifts]]
+
+    def close(self) -> None:
+        del self.counters, self.frames  # views must be released before the block is closed
+        self.memory.close()
+
+    def __enter__(self) -> "FrameReader":
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.close()
+
+
+def main() -> None:
+    parser = ArgumentParser(description="Read frames exported by the running game and print how many were read")
+    parser.add_argument("--seconds", type=float, default=5.0, help="how long to read frames")
+    parser.add_argument("--save", help="save the last read frame to this image file")
+    args = parser.parse_args()
+
+    with FrameReader() as reader:
+        print(f"attached to {reader.width}x{reader.height} frames, {reader.slots} slots")
+        frames_read: int = 0
+        first_sequence: int = reader.get_latest_sequence()
+        sequence: int = first_sequence
+        end_time: float = perf_counter() + args.seconds
+        while perf_counter() < end_time:
+            if reader.get_latest_sequence() == sequence:
+                sleep(0.001)
+                continue
+            sequence = reader.read_latest()
+            frames_read += 1
+        print(
+            f"read {frames_read} frames of {sequence - first_sequence} published ({frames_read / args.seconds:.1f}/s)"
+        )
+        if args.save and sequence:
+            pg.image.save(pg.surfarray.make_surface(reader.get_rgb().swapaxes(0, 1)), args.save)
+
+
+if __name__ == "__main__":
+    main()
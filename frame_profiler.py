@@ -0,0 +1,82 @@
+"""Module which contains FrameProfiler class which measures how long every phase of the frame takes"""
+
+from collections import deque
+from time import perf_counter
+from typing import Any, Callable
+import pygame as pg
+from constants import PROFILER_OVERLAY_UPDATE_FRAMES, PROFILER_WINDOW_FRAMES
+
+Phases = list[tuple[str, Callable[[], Any]]]  # (name, function) for every phase in order of calling
+
+
+class FrameProfiler:
+    """Keeps time of every named phase for the last PROFILER_WINDOW_FRAMES frames and draws it as overlay.
+    Nothing is measured when it's disabled: states call plain phase functions and only swap them for timed ones
+    (with get_phase_functions) when profiler is turned on"""
+
+    def __init__(self) -> None:
+        self.enabled: bool = False
+        self.frame_times: dict[str, float] = {}  # phase name -> seconds spent in it in current frame
+        self.history: dict[str, deque[float]] = {}  # phase name -> milliseconds spent in it in last frames
+        self.frames_number: int = 0
+        self.overlay: pg.Surface | None = None
+        self.font: pg.font.Font | None = None
+
+    def toggle(self) -> None:
+        self.enabled = not self.enabled
+        self.frame_times = {}
+        self.history = {}
+        self.overlay = None
+
+    def run_phase(self, name: str, function: Callable[..., Any], *args: Any) -> Any:
+        start_time: float = perf_counter()
+        result: Any = function(*args)
+        self.frame_times[name] = self.frame_times.get(name, 0.0) + perf_counter() - start_time
+        return result
+
+    def get_timed_function(self, name: str, function: Callable[[], Any]) -> Callable[[], Any]:
+        def timed_function() -> Any:
+            return self.run_phase(name, function)
+
+        return timed_function
+
+    def get_phase_functions(self, phases: Phases) -> list[Callable[[], Any]]:
+        """Returns phases' functions to call every frame (timed ones if profiler is enabled)"""
+        if not self.enabled:
+            return [function for _, function in phases]
+        return [self.get_timed_function(name, function) for name, function in phases]
+
+    def end_frame(self) -> None:
+        for name, seconds in self.frame_times.items():
+            if name not in self.history:
+                self.history[name] = deque(maxlen=PROFILER_WINDOW_FRAMES)
+            self.history[name].append(seconds * 1000)
+        self.frame_times = {}
+        self.frames_number += 1
+
+    def get_stats(self) -> list[tuple[str, float, float]]:
+        """Returns (phase name, average milliseconds, maximum milliseconds) for every phase in order of calling"""
+        return [(name, sum(times) / len(times), max(times)) for name, times in self.history.items()]
+
+    def get_overlay(self) -> pg.Surface:
+        """Returns surface with table of phases' times (it's rendered again only every few frames)"""
+        if self.overlay is None or self.frames_number % PROFILER_OVERLAY_UPDATE_FRAMES == 0:
+            if self.font is None:
+                self.font = pg.font.SysFont("consolas,dejavusansmono,couriernew,monospace", 15)
+            stats: list[tuple[str, float, float]] = self.get_stats()
+            lines: list[str] = [f"{'phase':<24}{'avg ms':>8}{'max ms':>8}"]
+            lines += [f"{name:<24}{average:>8.3f}{maximum:>8.3f}" for name, average, maximum in stats]
+            lines.append(f"{'total':<24}{sum(average for _, average, _ in stats):>8.3f}")
+            lines_surfs: list[pg.Surface] = [self.font.render(line, True, "#FFFFFF") for line in lines]
+            line_height: int = self.font.get_linesize()
+            self.overlay = pg.Surface(
+                (max(surf.get_width() for surf in lines_surfs) + 10, line_height * len(lines_surfs) + 10), pg.SRCALPHA
+            )
+            self.overlay.fill((0, 0, 0, 170))
+            self.overlay.blits(
+                [(surf, (5, 5 + ind * line_height)) for ind, surf in enumerate(lines_surfs)], doreturn=False
+            )
+        return self.overlay
+
+
+frame_profiler = FrameProfiler()
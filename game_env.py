@@ -0,0 +1,347 @@
+"""Module which contains GameEnv class (the game as environment for bots with reset() and step() like in Gym) and
+VectorGameEnv class which steps many environments at once in worker processes
+
+Run it as a script to measure stepping throughput with random actions, for example:
+    py game_env.py --envs 4 --steps 20000
+"""
+
+import os
+
+# SDL reads these when pygame initializes video and audio, so they must be set before any game module is imported
+os.environ["SDL_VIDEODRIVER"] = "dummy"
+os.environ["SDL_AUDIODRIVER"] = "dummy"
+
+import multiprocessing as mp
+from argparse import ArgumentParser
+from multiprocessing.connection import Connection
+from multiprocessing.shared_memory import SharedMemory
+from time import perf_counter
+from typing import Any
+import numpy as np
+import pygame as pg
+from constants import (
+    ENV_MAX_EPISODE_TICKS,
+    ENV_OBSERVED_BULLETS,
+    ENV_OBSERVED_ENEMIES,
+    ENV_OBSERVED_ITEMS,
+    GAME_SCREEN_HEIGHT,
+    GAME_SCREEN_WIDTH,
+    PIXEL_PERFECT_COLLISIONS,
+    TORPEDO_COIN_PRICE,
+)
+from input_control import PressedKeys
+from replay import HELD_KEYS_BITS, HELD_KEYS_MASK, TORPEDO_PRESSED_BIT
+from simulation import HeadlessSimulation
+
+# Action is the same bitmask of keys as replay's tick input: W, A, S, D, SPACE are held, K is pressed (torpedo)
+ACTIONS_NUMBER: int = (HELD_KEYS_MASK | TORPEDO_PRESSED_BIT) + 1
+
+# Observation is a vector of floats, positions are relative to the player and divided by the screen size
+PLAYER_FEATURES: int = 6  # x, y, is immortal, can shoot, can launch torpedo, has extra life
+ENEMY_FEATURES: int = 4  # dx, dy, is immortal, is present
+BULLET_FEATURES: int = 3  # dx, dy, is present
+ITEM_FEATURES: int = 5  # dx, dy, is coin, is score star, is flying heart (all zeros if not present)
+OBSERVATION_SIZE: int = (
+    PLAYER_FEATURES
+    + ENV_OBSERVED_ENEMIES * ENEMY_FEATURES
+    + ENV_OBSERVED_BULLETS * BULLET_FEATURES
+    + ENV_OBSERVED_ITEMS * ITEM_FEATURES
+)
+
+
+def get_nearest(positions: np.ndarray, number: int) -> np.ndarray:
+    """Returns indices of (at most) number positions nearest to (0, 0), the nearest first"""
+    if len(positions) <= number:
+        return np.argsort((positions**2).sum(axis=1), kind="stable")
+    distances: np.ndarray = (positions**2).sum(axis=1)
+    nearest: np.ndarray = np.argpartition(distances, number - 1)[:number]
+    return nearest[np.argsort(distances[nearest], kind="stable")]
+
+
+class GameEnv:
+    """Main game as environment for bots: reset() starts new session, step(action) simulates one tick with the
+    action's keys and returns (observation, reward, done, info). Reward is how much score and coins player got in
+    the tick. Episode is done when the game is over or after ENV_MAX_EPISODE_TICKS ticks (info["truncated"])"""
+
+    screen_size: np.ndarray = np.array([GAME_SCREEN_WIDTH, GAME_SCREEN_HEIGHT], dtype=np.float32)
+    # held keys' mask -> keys, so steps don't build them
+    actions_keys: list[PressedKeys] = [
+        PressedKeys(key for key, bit in HELD_KEYS_BITS.items() if mask & bit) for mask in range(HELD_KEYS_MASK + 1)
+    ]
+
+    def __init__(self, seed: int = 0, pixel_perfect_collisions: bool = PIXEL_PERFECT_COLLISIONS) -> None:
+        self.simulation = HeadlessSimulation(seed, pixel_perfect_collisions=pixel_perfect_collisions)
+        self.game = self.simulation.game
+        self.observation: np.ndarray = np.zeros(OBSERVATION_SIZE, dtype=np.float32)
+        self.reward_base: int = 0  # score + coins before the current step
+
+    def reset(self, seed: int) -> np.ndarray:
+        """Start new session (the same for the same seed and actions) and return its first observation"""
+        self.simulation.reset(seed)
+        self.reward_base = self.game.player.score + self.game.player.coins
+        return self.observe()
+
+    def get_info(self) -> dict[str, Any]:
+        return {
+            "score": self.game.player.score,
+            "coins": self.game.player.coins,
+            "ticks": self.simulation.frame,
+            "truncated": self.simulation.frame >= ENV_MAX_EPISODE_TICKS and not self.simulation.is_game_over(),
+        }
+
+    def step(self, action: int) -> tuple[np.ndarray, float, bool, dict[str, Any]]:
+        """Simulate one tick, the same calls MainGameState gets from replay's input mask"""
+        if action & TORPEDO_PRESSED_BIT:
+            self.game.get_event(pg.event.Event(pg.KEYDOWN, key=pg.K_k))
+        self.game.get_keys(self.actions_keys[action & HELD_KEYS_MASK])
+        self.game.update()
+        self.simulation.frame += 1
+
+        reward_base: int = self.game.player.score + self.game.player.coins
+        reward: float = float(reward_base - self.reward_base)
+        self.reward_base = reward_base
+        done: bool = self.simulation.is_game_over() or self.simulation.frame >= ENV_MAX_EPISODE_TICKS
+        return self.observe(), reward, done, self.get_info()
+
+    def write_relative(
+        self, positions: np.ndarray | list[tuple[int, int]], number: int, features: int, offset: int
+    ) -> np.ndarray:
+        """Write positions of (at most) number objects nearest to the player as their first two features and
+        returns indices of written objects"""
+        block: np.ndarray = self.observation[offset : offset + number * features].reshape(number, features)
+        block[:] = 0.0
+        if not len(positions):
+            return np.zeros(0, dtype=np.intp)
+        relative: np.ndarray = (np.array(positions, dtype=np.float32) - self.player_position) / self.screen_size
+        nearest: np.ndarray = get_nearest(relative, number)
+        block[: len(nearest), :2] = relative[nearest]
+        return nearest
+
+    def observe(self) -> np.ndarray:
+        """Returns observation of the current tick (the same array is updated by every call)"""
+        plane = self.game.player_group.sprite
+        self.player_position: np.ndarray = np.array(plane.rect.center, dtype=np.float32)
+        self.observation[:PLAYER_FEATURES] = (
+            *(self.player_position / self.screen_size),
+            plane.immortal_timer > 0,
+            plane.reload_time == 0,
+            self.game.torpedo_reload_timer.reload_time == 0 and self.game.player.coins >= TORPEDO_COIN_PRICE,
+            bool(self.game.player.extra_life),
+        )
+
+        offset: int = PLAYER_FEATURES
+        enemies_group = self.game.enemies_group
+        nearest: np.ndarray = self.write_relative(
+            [enemy.rect.center for enemy in enemies_group.enemies], ENV_OBSERVED_ENEMIES, ENEMY_FEATURES, offset
+        )
+        block: np.ndarray = self.observation[offset : offset + ENV_OBSERVED_ENEMIES * ENEMY_FEATURES]
+        block = block.reshape(ENV_OBSERVED_ENEMIES, ENEMY_FEATURES)
+        block[: len(nearest), 2] = enemies_group.values[nearest, enemies_group.IS_IMMORTAL]  # rows are in planes' order
+        block[: len(nearest), 3] = 1.0
+
+        offset += ENV_OBSERVED_ENEMIES * ENEMY_FEATURES
+        bullets = self.game.enemies_bullets
+        bullets_centers: np.ndarray = bullets.positions[: bullets.count] + np.array(bullets.image.get_size()) // 2
+        nearest = self.write_relative(bullets_centers, ENV_OBSERVED_BULLETS, BULLET_FEATURES, offset)
+        block = self.observation[offset : offset + ENV_OBSERVED_BULLETS * BULLET_FEATURES]
+        block.reshape(ENV_OBSERVED_BULLETS, BULLET_FEATURES)[: len(nearest), 2] = 1.0
+
+        offset += ENV_OBSERVED_BULLETS * BULLET_FEATURES
+        items: list[tuple[int, int]] = []
+        kinds: list[int] = []
+        for kind, group in enumerate(
+            (self.game.coins_group, self.game.score_stars_group, self.game.flying_hearts_group), start=2
+        ):
+            for item in group:
+                items.append(item.rect.center)
+                kinds.append(kind)
+        nearest = self.write_relative(items, ENV_OBSERVED_ITEMS, ITEM_FEATURES, offset)
+        block = self.observation[offset : offset + ENV_OBSERVED_ITEMS * ITEM_FEATURES]
+        block = block.reshape(ENV_OBSERVED_ITEMS, ITEM_FEATURES)
+        for row, ind in enumerate(nearest):
+            block[row, kinds[ind]] = 1.0
+        return self.observation
+
+
+class SharedArrays:
+    """Arrays of all environments of VectorGameEnv in one shared memory block, so workers write observations and
+    read actions in place and only short commands go through pipes"""
+
+    def __init__(self, envs_number: int, name: str | None = None) -> None:
+        self.layout: list[tuple[str, tuple[int, ...], type]] = [
+            ("observations", (envs_number, OBSERVATION_SIZE), np.float32),
+            ("rewards", (envs_number,), np.float32),
+            ("dones", (envs_number,), np.bool_),
+            ("actions", (envs_number,), np.int64),
+        ]
+        size: int = sum(int(np.prod(shape)) * np.dtype(dtype).itemsize for _, shape, dtype in self.layout)
+        # Block is created by VectorGameEnv and attached by name in workers
+        self.memory = SharedMemory(name, create=name is None, size=size if name is None else 0)
+        self.arrays: dict[str, np.ndarray] = {}
+        offset: int = 0
+        for array_name, shape, dtype in self.layout:
+            self.arrays[array_name] = np.ndarray(shape, dtype, self.memory.buf, offset)
+            offset += self.arrays[array_name].nbytes
+
+    def close(self) -> None:
+        self.arrays.clear()  # views must be released before the block is closed
+        self.memory.close()
+
+
+def run_worker(
+    connection: Connection,
+    memory_name: str,
+    envs_number: int,
+    env_ind: int,
+    env: GameEnv | None,
+    pixel_perfect_collisions: bool,
+) -> None:
+    """Loop of the worker process: runs commands of VectorGameEnv on its environment. Env is the parent's one (with
+    loaded graphics) if the worker was forked, otherwise the worker creates its own"""
+    shared = SharedArrays(envs_number, memory_name)
+    observations, rewards, dones, actions = (shared.arrays[name] for name, _, _ in shared.layout)
+    if env is None:
+        env = GameEnv(pixel_perfect_collisions=pixel_perfect_collisions)
+    seed: int = 0
+    try:
+        while True:
+            command, argument = connection.recv()
+            if command == "step":
+                observation, reward, done, info = env.step(int(actions[env_ind]))
+                rewards[env_ind] = reward
+                dones[env_ind] = done
+                if done:  # the next episode starts right away, its first observation replaces the last one
+                    seed += envs_number
+                    observation = env.reset(seed)
+                observations[env_ind] = observation
+                connection.send(info if done else None)
+            elif command == "reset":
+                seed = argument
+                observations[env_ind] = env.reset(seed)
+                connection.send(None)
+            elif command == "close":
+                break
+    except KeyboardInterrupt:
+        pass
+    finally:
+        del observations, rewards, dones, actions
+        shared.close()
+        connection.close()
+
+
+class VectorGameEnv:
+    """Steps envs_number GameEnvs at once, each in its own worker process. Observations, rewards, dones and actions
+    are in shared memory, pipes carry only commands and infos of finished episodes.
+    Environment i plays seeds seed + i, seed + i + envs_number, ... and is reset automatically when its episode is
+    done, so observations returned with done are the first ones of the next episode.
+    Graphics are loaded once in this process before workers are forked, so workers share them copy-on-write"""
+
+    def __init__(
+        self, envs_number: int, seed: int = 0, pixel_perfect_collisions: bool = PIXEL_PERFECT_COLLISIONS
+    ) -> None:
+        self.envs_number: int = envs_number
+        self.seed: int = seed
+        self.shared = SharedArrays(envs_number)
+        self.observations, self.rewards, self.dones, self.actions = (
+            self.shared.arrays[name] for name, _, _ in self.shared.layout
+        )
+
+        forking: bool = "fork" in mp.get_all_start_methods()
+        context = mp.get_context("fork" if forking else "spawn")
+        prototype: GameEnv | None = GameEnv(pixel_perfect_collisions=pixel_perfect_collisions) if forking else None
+        self.connections: list[Connection] = []
+        self.workers: list[mp.process.BaseProcess] = []
+        for env_ind in range(envs_number):
+            connection, worker_connection = context.Pipe()
+            worker = context.Process(
+                target=run_worker,
+                args=(
+                    worker_connection,
+                    self.shared.memory.name,
+                    envs_number,
+                    env_ind,
+                    prototype,
+                    pixel_perfect_collisions,
+                ),
+                daemon=True,
+            )
+            worker.start()
+            worker_connection.close()
+            self.connections.append(connection)
+            self.workers.append(worker)
+        self.closed: bool = False
+
+    def send_all(self, command: str, arguments: list[Any]) -> list[Any]:
+        """Send command to all workers first, so they run it in parallel, then wait for all answers"""
+        for connection, argument in zip(self.connections, arguments):
+            connection.send((command, argument))
+        return [connection.recv() for connection in self.connections]
+
+    def reset(self) -> np.ndarray:
+        """Start new sessions in all environments and return their first observations (array in shared memory)"""
+        self.send_all("reset", [self.seed + env_ind for env_ind in range(self.envs_number)])
+        return self.observations
+
+    def step(self, actions: np.ndarray | list[int]) -> tuple[np.ndarray, np.ndarray, np.ndarray, list[dict | None]]:
+        """Simulate one tick in all environments. Returns observations, rewards, dones (arrays in shared memory, they
+        are overwritten by the next step) and infos of episodes done in this step (None for the other environments)"""
+        self.actions[:] = actions
+        infos: list[dict | None] = self.send_all("step", [None] * self.envs_number)
+        return self.observations, self.rewards, self.dones, infos
+
+    def close(self) -> None:
+        if self.closed:
+            return
+        self.closed = True
+        for connection, worker in zip(self.connections, self.workers):
+            if worker.is_alive():
+                connection.send(("close", None))
+            connection.close()
+        for worker in self.workers:
+            worker.join()
+        del self.observations, self.rewards, self.dones, self.actions
+        self.shared.close()
+        self.shared.memory.unlink()
+
+    def __enter__(self) -> "VectorGameEnv":
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.close()
+
+
+def main() -> None:
+    parser = ArgumentParser(description="Step environments with random actions and print stepping throughput")
+    parser.add_argument("--envs", type=int, default=1, help="number of environments stepped in worker processes")
+    parser.add_argument("--steps", type=int, default=10_000, help="number of steps of every environment")
+    parser.add_argument(
+        "--seed", type=int, default=0, help="seed of the first environment (next ones use seed + 1, ...)"
+    )
+    parser.add_argument(
+        "--pixel-perfect-collisions",
+        action="store_true",
+        default=PIXEL_PERFECT_COLLISIONS,
+        help="check hits by images' pixels instead of collide rects",
+    )
+    args = parser.parse_args()
+
+    random_generator = np.random.default_rng(args.seed)
+    episodes_number: int = 0
+    total_reward: float = 0.0
+    with VectorGameEnv(args.envs, args.seed, args.pixel_perfect_collisions) as env:
+        env.reset()
+        start_time: float = perf_counter()
+        for _ in range(args.steps):
+            _, rewards, _, infos = env.step(random_generator.integers(0, ACTIONS_NUMBER, args.envs))
+            total_reward += float(rewards.sum())
+            episodes_number += sum(info is not None for info in infos)
+        elapsed_time: float = perf_counter() - start_time
+    total_steps: int = args.steps * args.envs
+    print(
+        f"{args.envs} environments: {total_steps} steps in {elapsed_time:.2f} s ({total_steps / elapsed_time:.0f} "
+        f"steps/s), finished episodes: {episodes_number}, total reward: {total_reward:.0f}"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+"""Module which contains classes to describe player's input independently of the keyboard and to read it"""
+
+from typing import Iterable
+import pygame as pg
+from save_load_system import SavedValue, save_load_system
+
+
+class PressedKeys:
+    """Immutable set of pressed keys which can be indexed like pg.key.ScancodeWrapper (keys[pg.K_w])"""
+
+    __slots__ = ("keys",)
+
+    def __init__(self, keys: Iterable[int] = ()) -> None:
+        self.keys: frozenset[int] = frozenset(keys)
+
+    def __getitem__(self, key: int) -> bool:
+        return key in self.keys
+
+
+class InputController:
+    """Reads player's input once per frame: events (only types the game uses get into the queue) and snapshot of
+    pressed keys which states and player's plane get instead of asking the keyboard themselves.
+    Actions can be rebound to other keys. States keep checking default keys of actions, so pressed keys and
+    KEYDOWN events are translated from bound keys to them"""
+
+    # action -> key which states check for it (and which it's bound to by default)
+    actions_keys: dict[str, int] = {
+        "up": pg.K_w,
+        "left": pg.K_a,
+        "down": pg.K_s,
+        "right": pg.K_d,
+        "shoot": pg.K_SPACE,
+        "torpedo": pg.K_k,
+        "pause": pg.K_ESCAPE,
+    }
+    used_events: tuple[int, ...] = (pg.QUIT, pg.KEYDOWN)  # all other events are blocked
+
+    def __init__(self) -> None:
+        self.bindings: dict[str, int] = dict(self.actions_keys)  # action -> key it's bound to
+        self.keys: PressedKeys = PressedKeys()  # snapshot of the current frame
+        self.update_lookups()
+
+    def update_lookups(self) -> None:
+        """Prepare everything which is used every frame, so taking snapshot doesn't look actions up"""
+        self.bound_keys: list[tuple[int, int]] = [
+            (self.bindings[action], action_key) for action, action_key in self.actions_keys.items()
+        ]
+        self.events_keys: dict[int, int | None] = {action_key: None for action_key in self.actions_keys.values()}
+        self.events_keys.update(self.bound_keys)  # bound key -> action's key (None if action's key is unbound now)
+
+    def block_unused_events(self) -> None:
+        """Block at SDL queue all event types the game doesn't handle (mouse motion, key releases, window events...)"""
+        pg.event.set_blocked(None)
+        pg.event.set_allowed(list(self.used_events))
+
+    def load_bindings(self) -> None:
+        saved_bindings: dict[str, SavedValue] = save_load_system.load_game_data(
+            {f"key_{action}": key for action, key in self.bindings.items()}
+        )
+        self.bindings = {action: int(saved_bindings[f"key_{action}"]) for action in self.actions_keys}
+        self.update_lookups()
+
+    def rebind(self, action: str, key: int) -> None:
+        """Bind action to the key (action which was bound to this key gets key of this action) and save bindings"""
+        for other_action, bound_key in self.bindings.items():
+            if bound_key == key:
+                self.bindings[other_action] = self.bindings[action]
+        self.bindings[action] = key
+        save_load_system.save_game_data({f"key_{action}": key for action, key in self.bindings.items()})
+        self.update_lookups()
+
+    def translate_event(self, event: pg.event.Event) -> pg.event.Event | None:
+        """Returns event with action's key instead of bound key (None if this key isn't used now)"""
+        if event.type != pg.KEYDOWN or event.key not in self.events_keys:
+            return event
+        action_key: int | None = self.events_keys[event.key]
+        if action_key is None:
+            return None
+        return event if action_key == event.key else pg.event.Event(pg.KEYDOWN, key=action_key, mod=event.mod)
+
+    def get_events(self) -> list[pg.event.Event]:
+        """Returns events of this frame and takes snapshot of pressed keys (available in self.keys)"""
+        events: list[pg.event.Event] = []
+        for event in pg.event.get():
+            translated_event: pg.event.Event | None = self.translate_event(event)
+            if translated_event is not None:
+                events.append(translated_event)
+        pressed: pg.key.ScancodeWrapper = pg.key.get_pressed()
+        self.keys = PressedKeys(action_key for bound_key, action_key in self.bound_keys if pressed[bound_key])
+        return events
+
+
+input_controller = InputController()
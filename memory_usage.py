@@ -0,0 +1,50 @@
+"""Module which contains function to get resident memory (RSS) of the game's process without extra dependencies"""
+
+import os
+import sys
+
+
+def get_resident_memory() -> int | None:
+    """Returns resident memory of current process in bytes (peak one on systems other than Linux and Windows)
+    or None if it can't be found out"""
+    if sys.platform.startswith("linux"):
+        try:
+            with open("/proc/self/statm") as statm_file:
+                return int(statm_file.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+        except (OSError, ValueError, IndexError):
+            return None
+
+    if sys.platform == "win32":
+        import ctypes
+        from ctypes import wintypes
+
+        class ProcessMemoryCounters(ctypes.Structure):
+            _fields_ = [
+                ("cb", wintypes.DWORD),
+                ("PageFaultCount", wintypes.DWORD),
+                ("PeakWorkingSetSize", ctypes.c_size_t),
+                ("WorkingSetSize", ctypes.c_size_t),
+                ("QuotaPeakPagedPoolUsage", ctypes.c_size_t),
+                ("QuotaPagedPoolUsage", ctypes.c_size_t),
+                ("QuotaPeakNonPagedPoolUsage", ctypes.c_size_t),
+                ("QuotaNonPagedPoolUsage", ctypes.c_size_t),
+                ("PagefileUsage", ctypes.c_size_t),
+                ("PeakPagefileUsage", ctypes.c_size_t),
+            ]
+
+        counters = ProcessMemoryCounters()
+        counters.cb = ctypes.sizeof(counters)
+        get_process_memory_info = ctypes.windll.psapi.GetProcessMemoryInfo
+        get_process_memory_info.argtypes = [wintypes.HANDLE, ctypes.POINTER(ProcessMemoryCounters), wintypes.DWORD]
+        process = ctypes.windll.kernel32.GetCurrentProcess()
+        if not get_process_memory_info(process, ctypes.byref(counters), counters.cb):
+            return None
+        return counters.WorkingSetSize
+
+    try:
+        import resource
+    except ImportError:
+        return None
+    # ru_maxrss is in bytes on macOS and in kilobytes on other systems
+    max_rss: int = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return max_rss if sys.platform == "darwin" else max_rss * 1024
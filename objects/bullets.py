@@ -1,73 +1,155 @@
-"""Module which describe Bullet classes"""
+"""Module which describe bullet systems (all bullets of one kind are stored in NumPy arrays instead of sprites)"""
 
+from itertools import repeat
+from typing import Iterable
+import numpy as np
 import pygame as pg
+from asset_loader import asset_loader
 from constants import PLAYER_BULLET_SPEED, ENEMY_BULLET_SPEED, GAME_SCREEN_WIDTH
 
 
-class Bullet(pg.sprite.Sprite):
-    """Base Bullet class for inheritance (PlayerBullet and EnemyBullet)"""
+def rects_to_boxes(rects: Iterable[pg.Rect]) -> np.ndarray:
+    """Returns array with shape (number of rects, 4) where every row is (left, top, right, bottom) of one rect"""
+    return np.array([(rect.left, rect.top, rect.right, rect.bottom) for rect in rects], dtype=np.int32).reshape(-1, 4)
 
-    def __init__(self) -> None:
-        super().__init__()
 
-    def create_collide_rect(self) -> None:
-        self.collide_rect: pg.Rect = self.rect.copy()
-        self.collide_rect.inflate_ip(-10, -5)  # (hardcoded)
+class BulletSystem:
+    """Base class for inheritance (PlayerBullets and EnemyBullets).
+    All bullets of one kind share image and speed, so only their positions are stored (in order of adding).
+    They are moved, culled, tested for collisions and drawn in batches"""
 
-    def update_collide_rect(self) -> None:
-        self.collide_rect.center = self.rect.center
+    speed: int  # px per frame
 
-    def check_boards(self) -> None:
-        """Method check that bullet is still in the game window and if it's not delete it from groups"""
-        if self.rect.right <= 0 or self.rect.left >= GAME_SCREEN_WIDTH:
-            self.kill()
+    @classmethod
+    def set_image(cls, image: pg.Surface) -> None:
+        """Set image for all bullets of this kind and calculate collide rect's size and offset for it"""
+        cls.image: pg.Surface = image
+        rect: pg.Rect = image.get_rect()
+        collide_rect: pg.Rect = rect.inflate(-10, -5)  # (hardcoded)
+        collide_rect.center = rect.center
+        cls.width, cls.height = rect.size
+        # collide rect's (left, top, right, bottom) relative to top-left of bullet's image
+        cls.collide_box_offset: tuple[int, int, int, int] = (
+            collide_rect.left,
+            collide_rect.top,
+            collide_rect.right,
+            collide_rect.bottom,
+        )
+        cls.image_box_offset: tuple[int, int, int, int] = (0, 0, cls.width, cls.height)  # for pixel-perfect collisions
+
+    def __init__(self, capacity: int = 64) -> None:
+        self.positions: np.ndarray = np.zeros((capacity, 2), dtype=np.int32)  # top-left (x, y) of every bullet
+        self.count: int = 0  # only first self.count rows of self.positions are bullets
+        self.added: int = 0  # how many bullets were added
+        self.allocations: int = 0  # how many times arrays had to grow to add bullet
+        self.high_water: int = 0  # maximum of self.count
+
+    def __len__(self) -> int:
+        return self.count
+
+    def append(self, left: int, top: int) -> None:
+        if self.count == len(self.positions):
+            self.positions = np.concatenate((self.positions, np.zeros_like(self.positions)))
+            self.allocations += 1
+        self.positions[self.count] = left, top
+        self.count += 1
+        self.added += 1
+        self.high_water = max(self.high_water, self.count)
+
+    def get_stats(self) -> dict[str, float]:
+        """Returns the same statistics as SpritePool (hit is adding bullet into already allocated array's row)"""
+        return {
+            "acquired": self.added,
+            "hit_rate": (self.added - self.allocations) / self.added if self.added else 0.0,
+            "in_use": self.count,
+            "high_water": self.high_water,
+        }
+
+    def empty(self) -> None:
+        self.count = 0
+
+    def remove(self, to_remove: np.ndarray) -> None:
+        """Remove bullets for which to_remove (bool array with length of self.count) is True, keeping order"""
+        kept_positions: np.ndarray = self.positions[: self.count][~to_remove]
+        self.count = len(kept_positions)
+        self.positions[: self.count] = kept_positions
 
     def move(self) -> None:
-        self.rect.x += self.speed
-        self.update_collide_rect()
+        self.positions[: self.count, 0] += self.speed
+
+    def check_boards(self) -> None:
+        """Remove all bullets which are not in the game window anymore"""
+        lefts: np.ndarray = self.positions[: self.count, 0]
+        out_of_screen: np.ndarray = (lefts + self.width <= 0) | (lefts >= GAME_SCREEN_WIDTH)
+        if out_of_screen.any():
+            self.remove(out_of_screen)
 
     def update(self) -> None:
+        if not self.count:
+            return
         self.move()
         self.check_boards()
 
-
-class PlayerBullet(Bullet):
-    """Class for player's bullet"""
-
-    def __init__(self, start_x: int, start_y: int) -> None:
-        super().__init__()
-        self.image: pg.Surface = self.images[0]
-
-        self.rect: pg.Rect = self.image.get_rect()
-        self.rect.left = start_x
-        self.rect.centery = start_y
-        self.create_collide_rect()
-
-        self.speed: int = PLAYER_BULLET_SPEED
+    def get_collisions(self, boxes: np.ndarray, box_offset: tuple[int, int, int, int] | None = None) -> np.ndarray:
+        """Returns bool array with shape (number of bullets, number of boxes) which is True where bullet collides with
+        box (left, top, right, bottom). Bullet's box is box_offset relative to its position (its collide rect if None)
+        """
+        lefts: np.ndarray = self.positions[: self.count, 0:1]
+        tops: np.ndarray = self.positions[: self.count, 1:2]
+        # Boxes are shifted by bullet's box offset instead of building box for every bullet
+        offset_left, offset_top, offset_right, offset_bottom = box_offset or self.collide_box_offset
+        return (
+            (lefts < boxes[:, 2] - offset_left)
+            & (boxes[:, 0] - offset_right < lefts)
+            & (tops < boxes[:, 3] - offset_top)
+            & (boxes[:, 1] - offset_bottom < tops)
+            # empty rects never collide (the same as in pg.Rect.colliderect)
+            & ((boxes[:, 0] < boxes[:, 2]) & (boxes[:, 1] < boxes[:, 3]))
+        )
+
+    def find_first_collisions(self, boxes: np.ndarray) -> np.ndarray:
+        """For every bullet returns index of the first box (left, top, right, bottom) it collides with or -1"""
+        collisions: np.ndarray = self.get_collisions(boxes)
+        return np.where(collisions.any(axis=1), collisions.argmax(axis=1), -1)
+
+    def collide_rect(self, rect: pg.Rect) -> np.ndarray:
+        """Returns bool array which is True for every bullet colliding with rect"""
+        if not self.count or not rect.width or not rect.height:
+            return np.zeros(self.count, dtype=bool)
+        return self.find_first_collisions(rects_to_boxes([rect])) == 0
+
+    def get_blits(self, offset_x: int = 0) -> Iterable[tuple[pg.Surface, list[int]]]:
+        """Returns (image, position) pairs of all bullets to draw them with one pg.Surface.blits call
+        (all bullets move with the same speed, so they're interpolated by shifting every one of them by offset_x)"""
+        positions: np.ndarray = self.positions[: self.count]
+        if offset_x:
+            positions = positions + (offset_x, 0)
+        return zip(repeat(self.image), positions.tolist())
+
+
+class PlayerBullets(BulletSystem):
+    """Class for all player's bullets"""
+
+    speed: int = PLAYER_BULLET_SPEED
 
     @classmethod
     def load_graphics(cls) -> None:
-        cls.images: list[pg.Surface] = [pg.image.load(f"assets/graphics/bullets/bullet2.png")]
-        cls.images[0] = pg.transform.rotozoom(cls.images[0], 0, 0.25).convert_alpha()
-
+        cls.set_image(asset_loader.load_image("assets/graphics/bullets/bullet2.png", 0.25))
 
-class EnemyBullet(Bullet):
-    """Class for enemy's bullet"""
+    def add(self, start_x: int, start_y: int) -> None:
+        """Add bullet with left border at start_x and vertical center at start_y"""
+        self.append(start_x, start_y - self.height // 2)
 
-    def __init__(self, start_x: int, start_y: int) -> None:
-        super().__init__()
 
-        self.image: pg.Surface = self.images[0]
+class EnemyBullets(BulletSystem):
+    """Class for all enemies' bullets"""
 
-        self.rect: pg.Rect = self.image.get_rect()
-        self.rect.right = start_x
-        self.rect.centery = start_y
-        self.create_collide_rect()
-
-        self.speed: int = -ENEMY_BULLET_SPEED
+    speed: int = -ENEMY_BULLET_SPEED
 
     @classmethod
     def load_graphics(cls) -> None:
-        cls.images: list[pg.Surface] = [pg.image.load(f"assets/graphics/bullets/bullet1.png")]
-        cls.images[0] = pg.transform.rotozoom(cls.images[0], 0, 0.25).convert_alpha()
-        cls.images[0] = pg.transform.flip(cls.images[0], True, False).convert_alpha()
+        cls.set_image(asset_loader.load_image("assets/graphics/bullets/bullet1.png", 0.25, flip_x=True))
+
+    def add(self, start_x: int, start_y: int) -> None:
+        """Add bullet with right border at start_x and vertical center at start_y"""
+        self.append(start_x - self.width, start_y - self.height // 2)
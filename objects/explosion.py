@@ -1,18 +1,47 @@
 """Module which contains Explosion class for explosion animation in game"""
 
+from collections import OrderedDict
 import pygame as pg
+from asset_loader import asset_loader
+from constants import (
+    EXPLOSION_FRAMES_CACHE_SIZE,
+    PLANE_EXPLOSION_SIZE_COEFFICIENT,
+    PLAYER_PLANE_EXPLOSION_SIZE_COEFFICIENT,
+    TORPEDO_EXPLOSION_SIZE_COEFFICIENT,
+)
+from .pool import PooledSprite
 
 
-class Explosion(pg.sprite.Sprite):
+class Explosion(PooledSprite):
     @classmethod
     def load_graphics(cls) -> None:
         cls.images: list[pg.Surface] = [
-            pg.image.load(f"assets/graphics/explosion/explosion_0{i}.png").convert_alpha() for i in range(1, 10, 1)
+            asset_loader.load_image(f"assets/graphics/explosion/explosion_0{i}.png") for i in range(1, 10, 1)
         ]
+        # size coefficient -> scaled frames shared by all explosions of this size (ordered from least recently used)
+        cls.scaled_images_cache: OrderedDict[float, list[pg.Surface]] = OrderedDict()
+        for size_coefficient in (
+            PLANE_EXPLOSION_SIZE_COEFFICIENT,
+            PLAYER_PLANE_EXPLOSION_SIZE_COEFFICIENT,
+            TORPEDO_EXPLOSION_SIZE_COEFFICIENT,
+        ):
+            cls.get_scaled_images(size_coefficient)
 
-    def __init__(self, center: tuple[int, int], size_coefficient: float) -> None:
-        super().__init__()
-        self.images = [pg.transform.scale_by(img, size_coefficient) for img in self.images]
+    @classmethod
+    def get_scaled_images(cls, size_coefficient: float) -> list[pg.Surface]:
+        """Returns animation frames scaled by size_coefficient, scaling them only if they are not in the cache"""
+        scaled_images: list[pg.Surface] | None = cls.scaled_images_cache.get(size_coefficient)
+        if scaled_images is None:
+            scaled_images = [pg.transform.scale_by(img, size_coefficient) for img in cls.images]
+            cls.scaled_images_cache[size_coefficient] = scaled_images
+            if len(cls.scaled_images_cache) > EXPLOSION_FRAMES_CACHE_SIZE:
+                cls.scaled_images_cache.popitem(last=False)
+        else:
+            cls.scaled_images_cache.move_to_end(size_coefficient)
+        return scaled_images
+
+    def reset(self, center: tuple[int, int], size_coefficient: float) -> None:
+        self.images: list[pg.Surface] = self.get_scaled_images(size_coefficient)
         self.image: pg.Surface = self.images[0]
         self.rect: pg.Rect = self.image.get_rect(center=center)
         self.current_animation_step = 0
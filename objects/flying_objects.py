@@ -1,7 +1,9 @@
 """Module which contains classes for some collectable flying objects in game sich as coins, stars etc"""
 
+from math import gcd
 from random import choice, randint
 import pygame as pg
+from asset_loader import asset_loader
 from constants import (
     GAME_SCREEN_HEIGHT,
     GAME_SCREEN_WIDTH,
@@ -69,8 +71,7 @@ class Coin(FlyingObject):
         cls.images: dict[str, list[pg.Surface]] = {}  # coin type name -> list of images for this coin
         for t in ["bronze", "silver", "gold"]:
             cls.images[t] = [
-                pg.transform.rotozoom(pg.image.load(BASE_PATH + f"coins/{t}/coin_{i}.png"), 0, 0.7).convert_alpha()
-                for i in range(0, 15, 1)
+                asset_loader.load_image(BASE_PATH + f"coins/{t}/coin_{i}.png", 0.7) for i in range(0, 15, 1)
             ]
 
     def __init__(self) -> None:
@@ -105,18 +106,21 @@ class Coin(FlyingObject):
 
 
 class ScoreStar(FlyingObject):
+    angle_step: int = gcd(SCORE_STAR_ANGLE_SPEED, 360)  # star's angle is always a multiple of this value
 
     @classmethod
     def load_graphics(cls) -> None:
-        cls.images: list[pg.Surface] = [
-            pg.transform.rotozoom(pg.image.load(BASE_PATH + "score_star/star.png"), 0, 0.25).convert_alpha()
+        cls.images: list[pg.Surface] = [asset_loader.load_image(BASE_PATH + "score_star/star.png", 0.25)]
+        # Rotation table: index is angle // angle_step, so animation only looks up prepared image and its size
+        cls.rotated_images: list[pg.Surface] = [
+            pg.transform.rotate(cls.images[0], angle) for angle in range(0, 360, cls.angle_step)
         ]
+        cls.rotated_sizes: list[tuple[int, int]] = [img.get_size() for img in cls.rotated_images]
 
     def __init__(self) -> None:
         super().__init__()
         self.image: pg.Surface = self.images[0]
-        self.start_image: pg.Surface = self.image  # Saving start image to then rotate it
-        self.current_angle = 0
+        self.current_angle = 0  # in range [0, 360)
         self.angle_speed: int = choice([SCORE_STAR_ANGLE_SPEED, -SCORE_STAR_ANGLE_SPEED])
         self.value: int = randint(SCORE_STAR_VALUE_RANGE[0], SCORE_STAR_VALUE_RANGE[1])
         self.set_up_rects()
@@ -125,9 +129,12 @@ class ScoreStar(FlyingObject):
         self.rect.x -= SCORE_STAR_SPEED_X
 
     def animation(self) -> None:
-        self.image = pg.transform.rotate(self.start_image, self.current_angle)
-        self.current_angle += self.angle_speed
-        self.rect = self.image.get_rect(center=self.rect.center)
+        rotation_ind: int = self.current_angle // self.angle_step
+        self.image = self.rotated_images[rotation_ind]
+        self.current_angle = (self.current_angle + self.angle_speed) % 360
+        center: tuple[int, int] = self.rect.center
+        self.rect.size = self.rotated_sizes[rotation_ind]
+        self.rect.center = center
 
     def get_value(self) -> int:
         return self.value
@@ -138,8 +145,7 @@ class FlyingHeart(FlyingObject):
     @classmethod
     def load_graphics(cls) -> None:
         cls.images: list[pg.Surface] = [
-            pg.transform.rotozoom(pg.image.load(BASE_PATH + f"hearts/heart{i}.png").convert_alpha(), 0, 0.3)
-            for i in range(1, 6, 1)
+            asset_loader.load_image(BASE_PATH + f"hearts/heart{i}.png", 0.3) for i in range(1, 6, 1)
         ]
 
     def __init__(self) -> None:
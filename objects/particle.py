@@ -1,19 +1,19 @@
 """Module which contains Particle class just for beautiful visual effect"""
 
 import pygame as pg
+from asset_loader import asset_loader
+from .pool import PooledSprite
 
 
-class Particle(pg.sprite.Sprite):
+class Particle(PooledSprite):
 
     @classmethod
     def load_graphics(cls) -> None:
         cls.images: list[pg.Surface] = [
-            pg.transform.rotozoom(pg.image.load(f"assets/graphics/particle/particle{i}.png"), 0, 0.2).convert_alpha()
-            for i in range(0, 15, 1)
+            asset_loader.load_image(f"assets/graphics/particle/particle{i}.png", 0.2) for i in range(0, 15, 1)
         ]
 
-    def __init__(self, center: tuple[int, int]) -> None:
-        super().__init__()
+    def reset(self, center: tuple[int, int]) -> None:
         self.image: pg.Surface = self.images[0]
         self.rect: pg.Rect = self.image.get_rect(center=center)
         self.current_animation_step = 0
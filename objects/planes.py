@@ -1,6 +1,8 @@
-"""Module which contains classes for player's plane, enemies' planes and base class for them"""
+"""Module which contains classes for player's plane, enemies' planes (and group which moves them) and base class
+for them"""
 
 from random import choice, randint
+import numpy as np
 import pygame as pg
 from constants import (
     GAME_SCREEN_HEIGHT,
@@ -16,6 +18,10 @@ from constants import (
     ENEMY_DELTA_Y,
     ENEMY_RELOAD_RANGE,
 )
+from asset_loader import asset_loader
+from event_scheduler import EventScheduler
+from input_control import PressedKeys
+from .bullets import EnemyBullets
 
 
 class Plane(pg.sprite.Sprite):
@@ -37,10 +43,12 @@ class Plane(pg.sprite.Sprite):
         if self.reload_time != 0:
             self.reload_time -= 1
 
+    def get_collide_rect_offset_y(self) -> float:
+        """Returns how much collide rect's center is lower than rect's center"""
+        return self.rect.width * 0.08 if self.type == 1 else self.rect.width * 0.04
+
     def update_collide_rect(self) -> None:
-        self.collide_rect.center = self.rect.centerx, self.rect.centery + (
-            self.rect.width * 0.08 if self.type == 1 else self.rect.width * 0.04
-        )
+        self.collide_rect.center = self.rect.centerx, self.rect.centery + self.get_collide_rect_offset_y()
 
     def set_reload_time(self, val: int) -> None:
         self.reload_time: int = val
@@ -63,9 +71,7 @@ class PlayerPlane(Plane):
         cls.images: dict[str, list[pg.Surface]] = {}  # color -> list of 2 elements
         for color in cls.possible_colors:
             imgs: list[pg.Surface] = [
-                pg.transform.rotozoom(
-                    pg.image.load(f"assets/graphics/planes/{color}1{part}.png"), 0, 0.15
-                ).convert_alpha()
+                asset_loader.load_image(f"assets/graphics/planes/{color}1{part}.png", 0.15)
                 for part in ("", "_immortal")
             ]
             cls.images[color] = imgs
@@ -92,9 +98,9 @@ class PlayerPlane(Plane):
         self.current_color: str = choice(self.possible_colors)
         self.image: pg.Surface = self.images[self.current_color][0]
         self.immortal_timer = 0
+        self.reload_time = 0
 
-    def handle_player_input(self) -> None:
-        keys: pg.key.ScancodeWrapper = pg.key.get_pressed()
+    def handle_player_input(self, keys: pg.key.ScancodeWrapper | PressedKeys) -> None:
         # Player movement considering edges of the screen
         if keys[pg.K_w]:
             self.rect.top = max(self.rect.top - PLAYER_SPEED_Y, 0)
@@ -110,23 +116,30 @@ class PlayerPlane(Plane):
         """Returns position for bullet to appear (left bound for x and center for y)"""
         return (self.collide_rect.right, self.collide_rect.centery)
 
-    def update(self) -> None:
+    def update(self, keys: pg.key.ScancodeWrapper | PressedKeys) -> None:
         if self.immortal_timer:
             self.animation()
             self.immortal_timer -= 1
         self.bullet_reload()
-        self.handle_player_input()
+        self.handle_player_input(keys)
 
 
 class EnemyPlane(Plane):
+    possible_colors: list[str] = ["red", "blue", "green", "yellow"]
+
+    @classmethod
+    def load_graphics(cls) -> None:
+        cls.images: dict[tuple[str, int], pg.Surface] = {}  # (color, type) -> image shared by all enemies
+        for color in cls.possible_colors:
+            for plane_type in (1, 2):
+                cls.images[(color, plane_type)] = asset_loader.load_image(
+                    f"assets/graphics/planes/{color}{plane_type}.png", 0.15, flip_x=True
+                )
+
     def __init__(self) -> None:
         super().__init__()
         self.type: int = randint(1, 2)
-        self.image: pg.Surface = pg.image.load(
-            f"assets/graphics/planes/{choice(['red', 'blue', 'green', 'yellow'])}{self.type}.png"
-        )
-        self.image = pg.transform.rotozoom(self.image, 0, 0.15).convert_alpha()
-        self.image = pg.transform.flip(self.image, True, False)
+        self.image: pg.Surface = self.images[(choice(self.possible_colors), self.type)]
 
         self.image_width: int = self.image.get_width()
         self.rect: pg.Rect = self.image.get_rect(
@@ -140,46 +153,146 @@ class EnemyPlane(Plane):
         self.pos_y_delta: int = randint(ENEMY_DELTA_Y[0], ENEMY_DELTA_Y[1])
         self.start_coor_y_top: int = self.rect.top
         self.is_immortal = True  # Until plane is not in the screen and sight range it's immortal
+        self.fire_order: int | None = None  # order of plane's shots in scheduler (given by EnemyGroup)
         self.create_collide_rect()
 
-    def move(self) -> None:
-        # if enemy hasn't reached its target yet
-        if self.rect.right >= self.right_target_x:
-            self.rect.x -= ENEMY_SPEED_X
-        else:
-            self.rect.y += self.speed_y
-            if self.speed_y > 0:  # Enemy is going down
-                if self.rect.bottom >= GAME_SCREEN_HEIGHT:
-                    self.rect.bottom = GAME_SCREEN_HEIGHT
-                    self.speed_y *= -1
-                elif self.rect.bottom >= self.start_coor_y_top + self.rect.height + self.pos_y_delta:
-                    self.speed_y *= -1
-
-            else:  # enemy is going up
-                if self.rect.top <= 0:
-                    self.rect.top = 0
-                    self.speed_y *= -1
-                elif self.rect.top <= self.start_coor_y_top - self.pos_y_delta:
-                    self.speed_y *= -1
-        self.update_collide_rect()
-
     def change_immortality(self) -> None:
         if self.is_immortal and self.rect.centerx <= GAME_SCREEN_WIDTH:
             self.is_immortal = False
 
-    def update_reload_time(self) -> None:
-        self.set_reload_time(randint(ENEMY_RELOAD_RANGE[0], ENEMY_RELOAD_RANGE[1]))
-
     def get_bullet_position(self) -> tuple[int, int]:
         """Returns position for bullet to appear (right bound for x and center for y)"""
         return (self.collide_rect.left, self.collide_rect.centery)
 
-    def can_shoot(self) -> bool:
-        return (
-            super().can_shoot() and self.rect.right <= self.right_target_x
-        )  # if there's no reload self.immortal_timer and plane's reached its target
+
+class EnemyGroup(pg.sprite.Group):
+    """Group of enemies' planes which moves all of them at once. While plane is in the group, its movement state
+    (position, vertical speed and immortality with the bounds they change at) is stored in one NumPy array, so every
+    update is a few array operations instead of methods of every plane. Planes' rects and collide rects are written
+    from the array after update (they're used by collisions and drawing), the rest of the state is written to plane
+    when it leaves the group.
+    Planes' shots are events of the scheduler: plane's next shot is scheduled when it shoots (and after its first
+    update), so only planes which shoot are touched"""
+
+    fire_event: str = "enemy fire"
+    fire_priority: int = 0  # planes shoot before other events of the same tick
+
+    # Columns of self.values
+    LEFT, TOP, SPEED_Y, IS_IMMORTAL = range(4)  # state which changes
+    TARGET_LEFT = 4  # plane flies to the left while its left is not less than this value
+    MAX_TOP = 5  # top when plane is on the bottom of the screen
+    DOWN_TURN_TOP = 6  # plane going down turns around at this top (on the bottom or pos_y_delta lower than start)
+    UP_TURN_TOP = 7  # plane going up turns around at this top
+    MORTAL_LEFT = 8  # plane can be killed when its left is not bigger than this value (its center is on the screen)
+
+    def __init__(self, scheduler: EventScheduler, capacity: int = 32) -> None:
+        super().__init__()
+        self.scheduler: EventScheduler = scheduler
+        self.enemies: list[EnemyPlane] = []  # planes in order of the rows (the same as order of the group)
+        self.enemies_by_order: dict[int, EnemyPlane] = {}  # plane's fire order -> plane
+        self.new_enemies: list[EnemyPlane] = []  # planes whose first shot isn't scheduled yet
+        self.values: np.ndarray = np.zeros((capacity, 9), dtype=np.int64)  # row for every plane
+        # (x, y) from rect's top-left to collide rect's center for every plane
+        self.collide_rect_offsets: np.ndarray = np.zeros((capacity, 2))
+
+    def add_internal(self, sprite: EnemyPlane, layer: int | None = None) -> None:
+        super().add_internal(sprite, layer)
+        count: int = len(self.enemies)
+        if count == len(self.values):
+            self.values = np.concatenate((self.values, np.zeros_like(self.values)))
+            self.collide_rect_offsets = np.concatenate(
+                (self.collide_rect_offsets, np.zeros_like(self.collide_rect_offsets))
+            )
+        rect: pg.Rect = sprite.rect
+        max_top: int = GAME_SCREEN_HEIGHT - rect.height
+        self.values[count] = (
+            rect.left,
+            rect.top,
+            sprite.speed_y,
+            sprite.is_immortal,
+            sprite.right_target_x - rect.width,
+            max_top,
+            min(max_top, sprite.start_coor_y_top + sprite.pos_y_delta),
+            max(0, sprite.start_coor_y_top - sprite.pos_y_delta),
+            GAME_SCREEN_WIDTH - rect.width // 2,
+        )
+        self.collide_rect_offsets[count] = (rect.width // 2, rect.height // 2 + sprite.get_collide_rect_offset_y())
+        self.enemies.append(sprite)
+        # Planes of the game's snapshot already have their shots in the scheduler
+        if sprite.fire_order is None:
+            sprite.fire_order = self.scheduler.next_order()  # so planes shooting at the same tick keep group's order
+            self.new_enemies.append(sprite)
+        self.enemies_by_order[sprite.fire_order] = sprite
+
+    def remove_internal(self, sprite: EnemyPlane) -> None:
+        super().remove_internal(sprite)
+        ind: int = self.enemies.index(sprite)
+        count: int = len(self.enemies)
+        speed_y, is_immortal = self.values[ind, self.SPEED_Y : self.IS_IMMORTAL + 1].tolist()
+        sprite.speed_y, sprite.is_immortal = speed_y, bool(is_immortal)
+        self.values[ind : count - 1] = self.values[ind + 1 : count]
+        self.collide_rect_offsets[ind : count - 1] = self.collide_rect_offsets[ind + 1 : count]
+        del self.enemies[ind]
+        del self.enemies_by_order[sprite.fire_order]  # its scheduled shot is skipped
+        if sprite in self.new_enemies:
+            self.new_enemies.remove(sprite)
+
+    def schedule_first_shots(self) -> None:
+        """Schedule the first shot of planes which were moved for the first time. Plane shoots when it has reached
+        its target and its reload is over (it's counted down once per update)"""
+        for enemy in self.new_enemies:
+            target_left: int = enemy.right_target_x - enemy.rect.width
+            updates_to_target: int = max(0, -((target_left - enemy.rect.left) // ENEMY_SPEED_X))
+            self.scheduler.schedule(
+                self.scheduler.tick + max(updates_to_target + 1, enemy.reload_time),
+                self.fire_event,
+                self.fire_priority,
+                enemy.fire_order,
+            )
+        self.new_enemies.clear()
+
+    def fire(self, fire_order: int, bullets: EnemyBullets) -> None:
+        """Shoot from plane with this fire order (if it's still alive) and schedule its next shot"""
+        enemy: EnemyPlane | None = self.enemies_by_order.get(fire_order)
+        if enemy is None:
+            return
+        bullets.add(*enemy.get_bullet_position())
+        reload_time: int = randint(ENEMY_RELOAD_RANGE[0], ENEMY_RELOAD_RANGE[1])
+        self.scheduler.schedule(self.scheduler.tick + reload_time, self.fire_event, self.fire_priority, fire_order)
 
     def update(self) -> None:
-        self.bullet_reload()
-        self.move()
-        self.change_immortality()
+        """Move and check immortality of all planes"""
+        count: int = len(self.enemies)
+        if not count:
+            return
+        values: np.ndarray = self.values[:count]
+        lefts, tops, speeds_y, is_immortal, target_lefts, max_tops, down_turn_tops, up_turn_tops, mortal_lefts = (
+            values.T
+        )
+
+        # Plane flies to its target from the right, then goes up and down
+        flying_in: np.ndarray = lefts >= target_lefts
+        np.subtract(lefts, ENEMY_SPEED_X, out=lefts, where=flying_in)
+        moving_y: np.ndarray = ~flying_in
+        np.add(tops, speeds_y, out=tops, where=moving_y)
+        going_down: np.ndarray = moving_y & (speeds_y > 0)
+        going_up: np.ndarray = moving_y & (speeds_y < 0)
+        np.minimum(tops, max_tops, out=tops, where=going_down)
+        np.maximum(tops, 0, out=tops, where=going_up)
+        turning: np.ndarray = (going_down & (tops >= down_turn_tops)) | (going_up & (tops <= up_turn_tops))
+        np.negative(speeds_y, out=speeds_y, where=turning)
+
+        becoming_mortal: np.ndarray = (is_immortal != 0) & (lefts <= mortal_lefts)
+        if becoming_mortal.any():
+            is_immortal[becoming_mortal] = 0
+            for ind in np.flatnonzero(becoming_mortal).tolist():
+                self.enemies[ind].is_immortal = False
+
+        positions: np.ndarray = values[:, : self.TOP + 1]
+        for enemy, position, collide_rect_center in zip(
+            self.enemies, positions.tolist(), (positions + self.collide_rect_offsets[:count]).tolist()
+        ):
+            enemy.rect.topleft = position
+            enemy.collide_rect.center = collide_rect_center
+        if self.new_enemies:
+            self.schedule_first_shots()
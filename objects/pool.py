@@ -0,0 +1,83 @@
+"""Module which contains classes to reuse often created sprites instead of allocating new ones"""
+
+from abc import ABCMeta, abstractmethod
+from typing import Any
+import pygame as pg
+
+
+class SpritePool:
+    """Keeps released sprites of one class and gives them back (reset with new arguments) on acquire"""
+
+    def __init__(self, sprite_class: type["PooledSprite"]) -> None:
+        self.sprite_class: type[PooledSprite] = sprite_class
+        self.free_sprites: list[PooledSprite] = []
+        self.acquired: int = 0  # how many times sprite was requested
+        self.hits: int = 0  # how many times released sprite was reused
+        self.in_use: int = 0  # sprites acquired and not released yet
+        self.high_water: int = 0  # maximum of in_use
+
+    def acquire(self, *args: Any) -> "PooledSprite":
+        self.acquired += 1
+        if self.free_sprites:
+            self.hits += 1
+            sprite: PooledSprite = self.free_sprites.pop()
+            sprite.reset(*args)
+        else:
+            sprite = self.sprite_class(*args)
+        sprite.in_pool = False
+        self.in_use += 1
+        self.high_water = max(self.high_water, self.in_use)
+        return sprite
+
+    def release(self, sprite: "PooledSprite") -> None:
+        if not sprite.in_pool:
+            sprite.in_pool = True
+            self.in_use -= 1
+            self.free_sprites.append(sprite)
+
+    def adopt(self, sprite: "PooledSprite") -> None:
+        """Count sprite which was created without the pool (copied from game's snapshot) as acquired one"""
+        sprite.in_pool = False
+        self.in_use += 1
+        self.high_water = max(self.high_water, self.in_use)
+
+    def get_stats(self) -> dict[str, float]:
+        return {
+            "acquired": self.acquired,
+            "hit_rate": self.hits / self.acquired if self.acquired else 0.0,
+            "in_use": self.in_use,
+            "high_water": self.high_water,
+        }
+
+
+class PooledSprite(pg.sprite.Sprite, metaclass=ABCMeta):
+    """Base class for sprites which are reused through their class' pool.
+    Create them with acquire() instead of constructor, they go back to the pool when removed from all groups"""
+
+    pool: SpritePool
+
+    def __init_subclass__(cls, **kwargs: Any) -> None:
+        super().__init_subclass__(**kwargs)
+        cls.pool = SpritePool(cls)
+
+    def __init__(self, *args: Any) -> None:
+        super().__init__()
+        self.in_pool: bool = False
+        self.reset(*args)
+
+    @classmethod
+    def acquire(cls, *args: Any) -> "PooledSprite":
+        return cls.pool.acquire(*args)
+
+    @abstractmethod
+    def reset(self, *args: Any) -> None:
+        """Set all per-instance state, called for new sprite and for every reuse of it"""
+
+    def kill(self) -> None:
+        super().kill()
+        self.pool.release(self)
+
+    def remove_internal(self, group: pg.sprite.AbstractGroup) -> None:
+        super().remove_internal(group)
+        if not self.alive():  # removed from the last group (for example with group.empty())
+            self.pool.release(self)
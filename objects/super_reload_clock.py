@@ -9,6 +9,8 @@ scipt_dir: str = os.path.dirname(os.path.abspath(__file__))
 sys.path.append(os.path.dirname(scipt_dir))
 
 from constants import TORPEDO_TIME_RELOAD
+from asset_loader import asset_loader
+from cached_font import CachedFont, get_cached_font
 
 
 class ReloadTimer:
@@ -16,16 +18,14 @@ class ReloadTimer:
     @classmethod
     def load_graphics(cls) -> None:
         cls.images: list[pg.Surface] = [
-            pg.image.load(f"assets/graphics/clock_timer/clock_{str(i)}.png") for i in range(1, 17, 1)
+            asset_loader.load_image(f"assets/graphics/clock_timer/clock_{str(i)}.png", 0.08) for i in range(1, 17, 1)
         ]
-        for ind in range(len(cls.images)):
-            cls.images[ind] = pg.transform.rotozoom(cls.images[ind], 0, 0.08).convert_alpha()
 
     def __init__(self, leftx: int, centery: int, path_to_font_for_countdown: str) -> None:
         self.reload_time: int = 0
         self.image: pg.Surface = self.images[0]
         self.rect: pg.Rect = self.image.get_rect(midleft=(leftx, centery))
-        self.timer_font = pg.font.Font(path_to_font_for_countdown, 20)
+        self.timer_font: CachedFont = get_cached_font(path_to_font_for_countdown, 20)
 
     def set_timer(self) -> None:
         self.reload_time = TORPEDO_TIME_RELOAD
@@ -43,7 +43,8 @@ class ReloadTimer:
             self.reload_time -= 1
             self.timer_animation()
 
-    def draw(self, screen: pg.Surface) -> None:
+    def get_blits(self) -> list[tuple[pg.Surface, pg.Rect]]:
+        """Returns (surface, rect) pairs to draw (clock and time left) or empty list if there's no reload"""
         if self.reload_time != 0:
             text_color: str = (
                 "#FF3333"
@@ -51,5 +52,5 @@ class ReloadTimer:
                 else "#FFA30B" if self.reload_time > TORPEDO_TIME_RELOAD / 4 else "#83FF67"
             )
             time_text_surf: pg.Surface = self.timer_font.render(f"{round(self.reload_time / 60, 2)}", True, text_color)
-            screen.blit(self.image, self.rect)
-            screen.blit(time_text_surf, time_text_surf.get_rect(center=self.rect.center))
+            return [(self.image, self.rect), (time_text_surf, time_text_surf.get_rect(center=self.rect.center))]
+        return []
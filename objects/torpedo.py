@@ -2,6 +2,7 @@
 
 from random import choice, randint
 import pygame as pg
+from asset_loader import asset_loader
 from constants import (
     GAME_SCREEN_HEIGHT,
     GAME_SCREEN_WIDTH,
@@ -10,20 +11,18 @@ from constants import (
     TORPEDO_SPEED_Y,
     TORPEDO_EXPLOSION_RECT_SIDE,
 )
+from .pool import PooledSprite
 
 
-class Torpedo(pg.sprite.Sprite):
+class Torpedo(PooledSprite):
 
     @classmethod
     def load_graphics(cls) -> None:
         cls.images: list[pg.Surface] = [
-            pg.image.load(f"assets/graphics/torpedo/torpedo_{i}.png") for i in range(1, 4, 1)
+            asset_loader.load_image(f"assets/graphics/torpedo/torpedo_{i}.png", 0.18) for i in range(1, 4, 1)
         ]
-        for ind in range(len(cls.images)):
-            cls.images[ind] = pg.transform.rotozoom(cls.images[ind], 0, 0.18).convert_alpha()
 
-    def __init__(self, start_x: int, start_y: int) -> None:
-        super().__init__()
+    def reset(self, start_x: int, start_y: int) -> None:
         self.image: pg.Surface = self.images[0]
         self.rect: pg.Rect = self.image.get_rect(midleft=(start_x, start_y))
         self.target_center_x: int = int(GAME_SCREEN_WIDTH * 0.85) + randint(-TORPEDO_DELTA_X, TORPEDO_DELTA_X)
@@ -0,0 +1,133 @@
+"""Module which contains renderers for main game: full screen one and the one which updates only changed rects"""
+
+from typing import Iterable
+import pygame as pg
+from background import GameBackground
+
+Blits = Iterable[tuple[pg.Surface, pg.Rect | tuple[int, int]]]  # (image, position) pairs for pg.Surface.blits
+
+
+class FullScreenRenderer:
+    """Redraws the whole screen every frame on top of scrolling background"""
+
+    def __init__(self, game_background: GameBackground) -> None:
+        self.game_background: GameBackground = game_background
+
+    def invalidate(self) -> None:
+        """Force full redraw in the next frame (every frame is full for this renderer)"""
+        return
+
+    def begin_frame(self, screen: pg.Surface) -> None:
+        self.screen: pg.Surface = screen
+
+    def draw_background(self, offset_x: int = 0) -> None:
+        """Draw scrolling background (shifted by offset_x px, which is used for interpolation)"""
+        self.game_background.draw_background(self.screen, offset_x)
+
+    def draw_static(self, surface: pg.Surface, rect: pg.Rect) -> None:
+        """Draw surface which rarely changes (HUD)"""
+        self.screen.blit(surface, rect)
+
+    def draw_sprites(self, blits: Blits) -> None:
+        """Draw surfaces which change or move every frame"""
+        self.screen.blits(blits, doreturn=False)
+
+    def end_frame(self) -> list[pg.Rect] | None:
+        """Returns rects which should be passed to pg.display.update (None means the whole screen)"""
+        return None
+
+
+class DirtyRectRenderer:
+    """Draws every frame on top of the previous one over static background. Only areas where sprites were drawn
+    in the previous frame are cleared, static surfaces (HUD) are redrawn only when they change or something
+    cleared them, and only changed rects are returned for pg.display.update"""
+
+    max_dirty_rects: int = 256  # if more rects were changed it's faster to update the whole screen
+
+    def __init__(self, background: pg.Surface) -> None:
+        self.background: pg.Surface = background  # the whole screen without any objects
+        self.full_redraw: bool = True
+        self.previous_sprites_rects: list[pg.Rect] = []
+        self.sprites_rects: list[pg.Rect] = []
+        self.previous_static: list[tuple[pg.Surface, pg.Rect]] = []
+        self.static: list[tuple[pg.Surface, pg.Rect]] = []  # static surfaces of this frame in drawing order
+        self.static_rects: list[pg.Rect] = []  # areas redrawn because of static surfaces
+        self.static_drawn: bool = False
+
+    def invalidate(self) -> None:
+        """Force full redraw in the next frame (for example when other state has drawn over the screen)"""
+        self.full_redraw = True
+
+    def begin_frame(self, screen: pg.Surface) -> None:
+        self.screen: pg.Surface = screen
+        self.sprites_rects = []
+        self.static = []
+        self.static_rects = []
+        self.static_drawn = False
+
+    def draw_background(self, offset_x: int = 0) -> None:
+        """Clear areas where sprites were drawn in the previous frame (or the whole screen). Background is static
+        here, so offset_x is ignored"""
+        if self.full_redraw:
+            self.screen.blit(self.background, (0, 0))
+        else:
+            for rect in self.previous_sprites_rects:
+                self.screen.blit(self.background, rect, rect)
+
+    def draw_static(self, surface: pg.Surface, rect: pg.Rect) -> None:
+        """Add surface which rarely changes (HUD), all of them are drawn before the first sprites"""
+        self.static.append((surface, pg.Rect(rect.topleft, surface.get_size())))  # blit uses only rect's top-left
+
+    def __draw_static_surfaces(self) -> None:
+        self.static_drawn = True
+        if self.full_redraw:
+            self.screen.blits(self.static, doreturn=False)
+            return
+
+        # Areas to redraw: old and new rects of changed surfaces and surfaces cleared under previous sprites
+        areas: list[pg.Rect] = []
+        for ind, (surface, rect) in enumerate(self.static):
+            if ind >= len(self.previous_static):
+                areas.append(rect)
+                continue
+            previous_surface, previous_rect = self.previous_static[ind]
+            if surface is not previous_surface or rect != previous_rect:
+                areas.extend((previous_rect, rect))
+            elif rect.collidelist(self.previous_sprites_rects) != -1:
+                areas.append(rect)
+        if not areas:
+            return
+
+        # Surfaces have transparency, so every surface touching redrawn area is redrawn fully over the background
+        added_new_area: bool = True
+        while added_new_area:
+            added_new_area = False
+            for _, rect in self.static:
+                if rect not in areas and rect.collidelist(areas) != -1:
+                    areas.append(rect)
+                    added_new_area = True
+
+        for area in areas:
+            self.screen.blit(self.background, area, area)
+        self.screen.blits(
+            ((surface, rect) for surface, rect in self.static if rect.collidelist(areas) != -1), doreturn=False
+        )
+        self.static_rects = areas
+
+    def draw_sprites(self, blits: Blits) -> None:
+        """Draw surfaces which change or move every frame and remember their rects to clear them in the next frame"""
+        if not self.static_drawn:
+            self.__draw_static_surfaces()
+        self.sprites_rects.extend(self.screen.blits(blits))
+
+    def end_frame(self) -> list[pg.Rect] | None:
+        """Returns rects which should be passed to pg.display.update (None means the whole screen)"""
+        if not self.static_drawn:
+            self.__draw_static_surfaces()
+        changed_rects: list[pg.Rect] | None = self.previous_sprites_rects + self.static_rects + self.sprites_rects
+        if self.full_redraw or len(changed_rects) > self.max_dirty_rects:
+            changed_rects = None
+        self.full_redraw = False
+        self.previous_sprites_rects = self.sprites_rects
+        self.previous_static = self.static
+        return changed_rects
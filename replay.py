@@ -0,0 +1,293 @@
+"""Module which contains classes to record gameplay sessions as seed and player's input and to play them back
+
+The game is deterministic for the same seed and input, so the replay contains only them: one bitmask of keys for
+every tick (run-length encoded and compressed) and checksums of the game state at keyframes to detect desyncs.
+Run it as a script to play a replay, for example:
+    py replay.py data_folder/replays/replay_20240101_120000_1234.flyreplay --seek 3600
+    py replay.py data_folder/replays/replay_20240101_120000_1234.flyreplay --unthrottled
+The first command shows it in the window at real time (LEFT/RIGHT keys seek 5 seconds back/forward), the second one
+plays it as fast as possible without window and prints the slowest ticks
+"""
+
+import os
+import struct
+import zlib
+from argparse import ArgumentParser
+from dataclasses import dataclass, field
+from itertools import groupby
+from time import perf_counter, strftime
+from typing import TYPE_CHECKING, Any
+import pygame as pg
+from constants import (
+    ABSOLUTE_DATA_FOLDER_PATH,
+    DATA_FOLDER_NAME,
+    FPS,
+    GAME_SCREEN_HEIGHT,
+    GAME_SCREEN_WIDTH,
+    REPLAY_KEYFRAME_INTERVAL,
+    REPLAYS_FOLDER_NAME,
+    REPLAYS_TO_KEEP,
+)
+from input_control import PressedKeys
+
+if TYPE_CHECKING:
+    from states.main_game_state import MainGameState
+
+REPLAY_MAGIC: bytes = b"FLYRREPL"
+REPLAY_VERSION: int = 2  # 2: enemies shoot in update, so they don't shoot in paused ticks
+REPLAY_HEADER: struct.Struct = struct.Struct("<8sHIIII")  # magic, version, seed, keyframe interval, ticks, checksums
+REPLAY_FILE_EXTENSION: str = ".flyreplay"
+
+# Bits of the tick's input mask
+HELD_KEYS_BITS: dict[int, int] = {pg.K_w: 1, pg.K_a: 2, pg.K_s: 4, pg.K_d: 8, pg.K_SPACE: 16}
+HELD_KEYS_MASK: int = sum(HELD_KEYS_BITS.values())
+TORPEDO_PRESSED_BIT: int = 32  # K key was pressed before this tick (KEYDOWN event)
+PAUSED_BIT: int = 64  # ESC key paused the game after held keys were handled, so the game wasn't updated in this tick
+
+
+def get_keys_mask(keys: pg.key.ScancodeWrapper | PressedKeys) -> int:
+    return sum(bit for key, bit in HELD_KEYS_BITS.items() if keys[key])
+
+
+def write_varint(buffer: bytearray, value: int) -> None:
+    """Write unsigned integer with 7 bits in every byte (the highest bit means that there are more bytes)"""
+    while value >= 0x80:
+        buffer.append(value & 0x7F | 0x80)
+        value >>= 7
+    buffer.append(value)
+
+
+def read_varint(data: bytes, position: int) -> tuple[int, int]:
+    """Returns integer written with write_varint at position and position after it"""
+    value: int = 0
+    shift: int = 0
+    while True:
+        byte: int = data[position]
+        position += 1
+        value |= (byte & 0x7F) << shift
+        if byte < 0x80:
+            return value, position
+        shift += 7
+
+
+class ReplayError(Exception):
+    """Replay file is broken or was written by unsupported version"""
+
+
+@dataclass
+class Replay:
+    seed: int
+    inputs: bytearray = field(default_factory=bytearray)  # input mask of every tick
+    checksums: list[int] = field(default_factory=list)  # game state's checksum after every keyframe_interval ticks
+    keyframe_interval: int = REPLAY_KEYFRAME_INTERVAL
+
+    def encode(self) -> bytes:
+        body = bytearray()
+        # Keys are usually held for many ticks, so every run of the same masks is written as (mask, length)
+        for mask, run in groupby(self.inputs):
+            body.append(mask)
+            write_varint(body, sum(1 for _ in run))
+        body += struct.pack(f"<{len(self.checksums)}I", *self.checksums)
+        header: bytes = REPLAY_HEADER.pack(
+            REPLAY_MAGIC, REPLAY_VERSION, self.seed, self.keyframe_interval, len(self.inputs), len(self.checksums)
+        )
+        return header + zlib.compress(bytes(body), 9)
+
+    @classmethod
+    def decode(cls, data: bytes) -> "Replay":
+        try:
+            magic, version, seed, keyframe_interval, ticks_number, checksums_number = REPLAY_HEADER.unpack_from(data)
+            if magic != REPLAY_MAGIC or version != REPLAY_VERSION:
+                raise ReplayError("it's not a replay file or it was written by other version of the game")
+            body: bytes = zlib.decompress(data[REPLAY_HEADER.size :])
+            inputs = bytearray()
+            position: int = 0
+            while len(inputs) < ticks_number:
+                mask: int = body[position]
+                run_length, position = read_varint(body, position + 1)
+                inputs += bytes((mask,)) * run_length
+            checksums: list[int] = list(struct.unpack_from(f"<{checksums_number}I", body, position))
+        except (struct.error, zlib.error, IndexError) as error:
+            raise ReplayError(f"replay file is broken ({error})") from error
+        return cls(seed, inputs, checksums, keyframe_interval)
+
+    @classmethod
+    def load(cls, file_path: str) -> "Replay":
+        with open(file_path, "rb") as replay_file:
+            return cls.decode(replay_file.read())
+
+    def save(self, file_path: str) -> None:
+        with open(file_path, "wb") as replay_file:
+            replay_file.write(self.encode())
+
+
+def get_replays_folder_path() -> str:
+    return os.path.join(ABSOLUTE_DATA_FOLDER_PATH, DATA_FOLDER_NAME, REPLAYS_FOLDER_NAME)
+
+
+def save_replay(replay: Replay) -> str:
+    """Save replay into replays folder (deleting the oldest ones if there are more than REPLAYS_TO_KEEP) and returns
+    its path"""
+    folder_path: str = get_replays_folder_path()
+    os.makedirs(folder_path, exist_ok=True)
+    file_path: str = os.path.join(
+        folder_path, f"replay_{strftime('%Y%m%d_%H%M%S')}_{replay.seed}{REPLAY_FILE_EXTENSION}"
+    )
+    replay.save(file_path)
+    # Names start with time, so sorting them sorts replays from the oldest one
+    replays_names: list[str] = sorted(name for name in os.listdir(folder_path) if name.endswith(REPLAY_FILE_EXTENSION))
+    for name in replays_names[: max(0, len(replays_names) - REPLAYS_TO_KEEP)]:
+        os.remove(os.path.join(folder_path, name))
+    return file_path
+
+
+class ReplayRecorder:
+    """Collects input which MainGameState receives in every tick (one get_keys call before update, K key presses
+    and pauses), so playing it back with the same seed repeats the session exactly"""
+
+    def __init__(self, seed: int) -> None:
+        self.replay = Replay(seed)
+        self.mask: int = 0  # input mask of the current tick
+
+    def press_torpedo(self) -> None:
+        self.mask |= TORPEDO_PRESSED_BIT
+
+    def set_keys(self, keys: pg.key.ScancodeWrapper | PressedKeys) -> None:
+        self.mask = self.mask & ~HELD_KEYS_MASK | get_keys_mask(keys)
+
+    def end_tick(self, game: "MainGameState", paused: bool = False) -> None:
+        self.replay.inputs.append(self.mask | PAUSED_BIT if paused else self.mask)
+        self.mask = 0
+        if len(self.replay.inputs) % self.replay.keyframe_interval == 0:
+            self.replay.checksums.append(game.get_checksum())
+
+
+class ReplayPlayer:
+    """Plays replay by driving MainGameState with recorded input. Snapshots of the game are taken at keyframes
+    while it's played, so seek() restores the nearest one before the tick and simulates only ticks after it"""
+
+    def __init__(self, replay: Replay, game: "MainGameState") -> None:
+        self.replay: Replay = replay
+        self.game: "MainGameState" = game
+        self.snapshots: dict[int, dict[str, Any]] = {}  # tick -> snapshot of the game before this tick
+        self.desynced_ticks: list[int] = []  # keyframes where game state differs from the recorded one
+        self.keys_cache: dict[int, PressedKeys] = {}  # held keys' mask -> pressed keys
+        self.game.reset_game(replay.seed)
+        self.game.set_undone()
+        self.game.next = None
+        self.tick: int = 0
+        self.snapshots[0] = self.game.get_snapshot()
+
+    def get_ticks_number(self) -> int:
+        return len(self.replay.inputs)
+
+    def is_finished(self) -> bool:
+        return self.tick >= len(self.replay.inputs)
+
+    def get_keys(self, mask: int) -> PressedKeys:
+        held_keys_mask: int = mask & HELD_KEYS_MASK
+        if held_keys_mask not in self.keys_cache:
+            self.keys_cache[held_keys_mask] = PressedKeys(
+                key for key, bit in HELD_KEYS_BITS.items() if held_keys_mask & bit
+            )
+        return self.keys_cache[held_keys_mask]
+
+    def step(self) -> None:
+        """Play one tick (the same calls MainGameState got while it was recorded)"""
+        mask: int = self.replay.inputs[self.tick]
+        if mask & TORPEDO_PRESSED_BIT:
+            self.game.get_event(pg.event.Event(pg.KEYDOWN, key=pg.K_k))
+        self.game.get_keys(self.get_keys(mask))
+        if not mask & PAUSED_BIT:
+            self.game.update()
+        self.tick += 1
+
+        if self.tick % self.replay.keyframe_interval == 0:
+            checksum_ind: int = self.tick // self.replay.keyframe_interval - 1
+            if (
+                checksum_ind < len(self.replay.checksums)
+                and self.game.get_checksum() != self.replay.checksums[checksum_ind]
+                and self.tick not in self.desynced_ticks
+            ):
+                self.desynced_ticks.append(self.tick)
+            if self.tick not in self.snapshots:
+                self.snapshots[self.tick] = self.game.get_snapshot()
+
+    def seek(self, tick: int) -> None:
+        """Go to the state before this tick"""
+        tick = min(max(tick, 0), self.get_ticks_number())
+        keyframe: int = max(snapshot_tick for snapshot_tick in self.snapshots if snapshot_tick <= tick)
+        if not keyframe <= self.tick <= tick:  # playing from the current tick is faster if it's after keyframe
+            self.game.load_snapshot(self.snapshots[keyframe])
+            self.tick = keyframe
+        while self.tick < tick:
+            self.step()
+
+
+def play_in_window(player: ReplayPlayer) -> None:
+    screen: pg.Surface = pg.display.set_mode((GAME_SCREEN_WIDTH, GAME_SCREEN_HEIGHT))
+    pg.display.set_caption("Fly RUSH! (replay)")
+    clock = pg.time.Clock()
+    while not player.is_finished():
+        for event in pg.event.get():
+            if event.type == pg.QUIT:
+                return
+            if event.type == pg.KEYDOWN and event.key in (pg.K_LEFT, pg.K_RIGHT):
+                player.seek(player.tick + (FPS * 5 if event.key == pg.K_RIGHT else -FPS * 5))
+                player.game.renderer.invalidate()
+        player.step()
+        player.game.draw(screen)
+        pg.display.update(player.game.dirty_rects)
+        clock.tick(FPS)
+
+
+def play_unthrottled(player: ReplayPlayer, slowest_ticks_number: int) -> None:
+    ticks_times: list[tuple[float, int]] = []
+    start_tick: int = player.tick
+    start_time: float = perf_counter()
+    while not player.is_finished():
+        tick_start_time: float = perf_counter()
+        player.step()
+        ticks_times.append((perf_counter() - tick_start_time, player.tick - 1))
+    elapsed_time: float = perf_counter() - start_time
+    played_ticks: int = player.tick - start_tick
+    print(f"played {played_ticks} ticks in {elapsed_time:.2f} s ({played_ticks / max(elapsed_time, 1e-9):.0f} ticks/s)")
+    for tick_time, tick in sorted(ticks_times, reverse=True)[:slowest_ticks_number]:
+        print(f"tick {tick}: {tick_time * 1000:.3f} ms (watch it with --seek {max(0, tick - FPS)})")
+
+
+def main() -> None:
+    parser = ArgumentParser(description="Play recorded gameplay session")
+    parser.add_argument("replay_path", help="path to replay file")
+    parser.add_argument("--seek", type=int, default=0, help="tick to start playing from")
+    parser.add_argument("--unthrottled", action="store_true", help="play as fast as possible without window")
+    parser.add_argument("--slowest", type=int, default=10, help="number of the slowest ticks to print (unthrottled)")
+    args = parser.parse_args()
+
+    if args.unthrottled:
+        # SDL reads these when pygame initializes video and audio, so they must be set before game modules are imported
+        os.environ["SDL_VIDEODRIVER"] = "dummy"
+    os.environ["SDL_AUDIODRIVER"] = "dummy"
+    from sounds_and_music_control import audio_controller
+    from states.main_game_state import MainGameState
+
+    replay: Replay = Replay.load(args.replay_path)
+    pg.init()
+    pg.display.set_mode((GAME_SCREEN_WIDTH, GAME_SCREEN_HEIGHT) if not args.unthrottled else (1, 1))
+    audio_controller.mute()
+    game = MainGameState()
+    game.interpolate = False  # game is drawn once after every tick
+    game.setup()
+    player = ReplayPlayer(replay, game)
+    player.seek(args.seek)
+
+    if args.unthrottled:
+        play_unthrottled(player, args.slowest)
+    else:
+        play_in_window(player)
+    if player.desynced_ticks:
+        print(f"game state differs from the recorded one at ticks: {', '.join(map(str, player.desynced_ticks))}")
+
+
+if __name__ == "__main__":
+    main()
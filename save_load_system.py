@@ -1,71 +1,197 @@
 """Module which contains system for save and load data for the game"""
 
+import atexit
+import json
+import os
 import pickle as pc
-from os import mkdir, path
+import threading
+from time import perf_counter
 from typing import Any
-from constants import DATA_FOLDER_NAME, DATA_FILE_EXTENSION, ABSOLUTE_DATA_FOLDER_PATH
+from constants import (
+    DATA_FOLDER_NAME,
+    DATA_FILE_EXTENSION,
+    DATA_FILE_NAME,
+    ABSOLUTE_DATA_FOLDER_PATH,
+    SAVE_FLUSH_TIMEOUT,
+)
+
+SavedValue = str | int | float
+
+
+class PrimitivesUnpickler(pc.Unpickler):
+    """Unpickler for data files of old game versions. It refuses to create objects of any classes (only builtin
+    primitives like int and str can be loaded), so loading a changed file can't execute code"""
+
+    def find_class(self, module: str, name: str) -> Any:
+        raise pc.UnpicklingError(f"{module}.{name} can't be loaded from data file")
 
 
 class GameSaveLoadSystem:
+    """All saved data is read from the data file once and kept in memory, so reads don't touch the disk.
+    Changes are written to the single JSON data file atomically (new file is written and then replaces old one)
+    by background writer thread, so saving never waits for the disk. Saves made while the writer is busy are
+    coalesced into one write. Call flush() to wait until everything is written (it's also done at exit)"""
 
     def __init__(self) -> None:
         """
         Args:
             absolute_folder_path (str): absolute path to the folder which will contain data_folder
-            file_extension (str): file extension which will be used for data saving (starts with .); Example: .data
+            data_file_name (str): name of the file which contains all saved data
+            file_extension (str): extension of the files old versions saved every entry into (starts with .)
         """
         self.absolute_folder_path: str = ABSOLUTE_DATA_FOLDER_PATH
-        self.file_extension: str = DATA_FILE_EXTENSION
         self.data_folder_name: str = DATA_FOLDER_NAME
+        self.data_file_name: str = DATA_FILE_NAME
+        self.file_extension: str = DATA_FILE_EXTENSION
+        self.data: dict[str, SavedValue] | None = None  # read on the first access
 
-    def save_data_to_file(self, file_name: str, data_to_save: str | int | float) -> None:
-        """Method to save single data entry to single file"""
-        if not path.exists(path.join(self.absolute_folder_path, self.data_folder_name)):
-            mkdir(path.join(self.absolute_folder_path, self.data_folder_name))
+        self.condition = threading.Condition()  # guards data and everything below
+        self.writer_thread: threading.Thread | None = None  # started on the first save
+        self.write_requested: bool = False
+        self.is_writing: bool = False
+        # Metrics
+        self.queue_depth: int = 0  # saves which are waiting for the next write (all of them are written at once)
+        self.saves_number: int = 0
+        self.writes_number: int = 0
+        self.failed_writes_number: int = 0
+        self.total_write_time: float = 0.0  # seconds
+        self.max_write_time: float = 0.0  # seconds
 
-        file_path: str = path.join(self.absolute_folder_path, self.data_folder_name, file_name + self.file_extension)
-        with open(file_path, "wb") as data_file:
-            pc.dump(data_to_save, data_file)
+    def get_data_folder_path(self) -> str:
+        return os.path.join(self.absolute_folder_path, self.data_folder_name)
 
-    def load_data(self, file_name: str) -> str | int | float:
-        """Method to load single data entry from single file"""
-        if not path.exists(path.join(self.absolute_folder_path, self.data_folder_name)):
-            mkdir(path.join(self.absolute_folder_path, self.data_folder_name))
-        file_path: str = path.join(self.absolute_folder_path, self.data_folder_name, file_name + self.file_extension)
-        if not path.exists(file_path):
-            self.save_data_to_file("", file_name)
+    def get_data_file_path(self) -> str:
+        return os.path.join(self.get_data_folder_path(), self.data_file_name)
 
-        with open(file_path, "rb") as data_file:
-            data = pc.load(data_file)
+    def get_data(self) -> dict[str, SavedValue]:
+        if self.data is None:
+            if os.path.exists(self.get_data_file_path()):
+                self.data = self.read_data_file()
+            else:
+                # Data saved by old versions of the game is moved into the data file
+                self.data = self.read_old_data_files()
+                if self.data:
+                    self.request_write()
+        return self.data
 
+    def read_data_file(self) -> dict[str, SavedValue]:
+        try:
+            with open(self.get_data_file_path(), "r", encoding="utf-8") as data_file:
+                data: Any = json.load(data_file)
+        except (OSError, ValueError):
+            return {}  # broken file, the game starts with default values
+        return data if isinstance(data, dict) else {}
+
+    def read_old_data_files(self) -> dict[str, SavedValue]:
+        """Returns data from files which old versions of the game saved every entry into (with pickle)"""
+        data: dict[str, SavedValue] = {}
+        folder_path: str = self.get_data_folder_path()
+        if not os.path.isdir(folder_path):
+            return data
+        for file_name in os.listdir(folder_path):
+            key, extension = os.path.splitext(file_name)
+            if extension != self.file_extension or not key:
+                continue
+            try:
+                with open(os.path.join(folder_path, file_name), "rb") as data_file:
+                    value: Any = PrimitivesUnpickler(data_file).load()
+            except (OSError, pc.UnpicklingError, EOFError, ValueError):
+                continue
+            if isinstance(value, (str, int, float)):
+                data[key] = value
         return data
 
-    def load_game_data(self, files_to_load_dict: dict[str, Any]) -> dict[str, Any]:
-        """Method to load all data from all files in one dict
+    def write_data_file(self, data: dict[str, SavedValue]) -> None:
+        os.makedirs(self.get_data_folder_path(), exist_ok=True)
+        file_path: str = self.get_data_file_path()
+        temporary_file_path: str = file_path + ".tmp"
+        with open(temporary_file_path, "w", encoding="utf-8") as data_file:
+            json.dump(data, data_file, separators=(",", ":"))
+            data_file.flush()
+            os.fsync(data_file.fileno())
+        # Replacing is atomic, so data file is always either old or new one even if the game is closed while saving
+        os.replace(temporary_file_path, file_path)
+
+    def request_write(self) -> None:
+        with self.condition:
+            self.write_requested = True
+            self.queue_depth += 1
+            self.saves_number += 1
+            if self.writer_thread is None:
+                self.writer_thread = threading.Thread(target=self.run_writer, name="save writer", daemon=True)
+                self.writer_thread.start()
+                atexit.register(self.flush, SAVE_FLUSH_TIMEOUT)
+            self.condition.notify_all()
+
+    def run_writer(self) -> None:
+        while True:
+            with self.condition:
+                self.condition.wait_for(lambda: self.write_requested)
+                self.write_requested = False
+                self.is_writing = True
+                self.queue_depth = 0
+                data: dict[str, SavedValue] = dict(self.data)  # snapshot, so data can be changed while writing
+
+            start_time: float = perf_counter()
+            failed: bool = False
+            try:
+                self.write_data_file(data)
+            except Exception:  # not only OSError: json can't serialize some value, the writer mustn't stop anyway
+                failed = True  # data stays in memory and will be written with the next save
+            finally:
+                # flush() waits for is_writing to be reset, so it's done even if writing raised
+                write_time: float = perf_counter() - start_time
+                with self.condition:
+                    self.is_writing = False
+                    self.writes_number += 1
+                    self.failed_writes_number += int(failed)
+                    self.total_write_time += write_time
+                    self.max_write_time = max(self.max_write_time, write_time)
+                    self.condition.notify_all()
+
+    def flush(self, timeout: float | None = None) -> bool:
+        """Wait until all saves are written, returns False if timeout (in seconds) expired before that"""
+        with self.condition:
+            return self.condition.wait_for(lambda: not self.write_requested and not self.is_writing, timeout)
+
+    def get_stats(self) -> dict[str, float]:
+        """Returns writer's metrics: waiting saves, saves, writes (failed ones too) and write time in milliseconds"""
+        with self.condition:
+            return {
+                "queue_depth": self.queue_depth,
+                "saves": self.saves_number,
+                "writes": self.writes_number,
+                "failed_writes": self.failed_writes_number,
+                "average_write_ms": self.total_write_time / self.writes_number * 1000 if self.writes_number else 0.0,
+                "max_write_ms": self.max_write_time * 1000,
+            }
+
+    def load_game_data(self, data_to_load_dict: dict[str, SavedValue]) -> dict[str, SavedValue]:
+        """Method to load saved data entries in one dict
 
         Args:
-            files_to_load_dict (dict[str, Any]): dictionary which contains key-value pairs where key is the name for the file
-            and value is the default value which will be returned in case file is empty.
+            data_to_load_dict (dict[str, Any]): dictionary which contains key-value pairs where key is the name of the
+            entry and value is the default value which will be returned in case this entry wasn't saved.
 
         Returns:
-            dict: key is the name of the file and the value is the value assigned to it
+            dict: key is the name of the entry and the value is the value assigned to it
         """
-        return_data: dict[str, Any] = files_to_load_dict.copy()
-        for file_name in files_to_load_dict:
-            file_path: str = path.join(
-                self.absolute_folder_path, self.data_folder_name, file_name + self.file_extension
-            )
-            if path.exists(file_path):
-                return_data[file_name] = self.load_data(file_name)
-
-        return return_data
+        data: dict[str, SavedValue] = self.get_data()
+        return {key: data.get(key, default) for key, default in data_to_load_dict.items()}
 
-    def save_game_data(self, files_to_save_dict) -> None:
-        """Method to save all data from game with 1 dict
+    def save_game_data(self, data_to_save_dict: dict[str, SavedValue]) -> None:
+        """Method to save data entries from 1 dict (file is written in background only if some value has changed)
 
         Args:
-            files_to_save_dict (dict[str, Any]): dictionary which contains key-value pairs where key is the name for the file
-            and value is the value to write in this file.
+            data_to_save_dict (dict[str, Any]): dictionary which contains key-value pairs where key is the name of the
+            entry and value is the value to save.
         """
-        for file_name, data in files_to_save_dict.items():
-            self.save_data_to_file(file_name, data)
+        data: dict[str, SavedValue] = self.get_data()
+        if all(key in data and data[key] == value for key, value in data_to_save_dict.items()):
+            return
+        with self.condition:
+            data.update(data_to_save_dict)
+        self.request_write()
+
+
+save_load_system = GameSaveLoadSystem()
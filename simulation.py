@@ -0,0 +1,164 @@
+"""Module which contains HeadlessSimulation class to run main game logic without window, drawing and audio
+
+Run it as a script to measure simulation throughput, for example:
+    py simulation.py --sessions 100 --seed 0 --random-input
+"""
+
+import os
+
+# SDL reads these when pygame initializes video and audio, so they must be set before any game module is imported
+os.environ["SDL_VIDEODRIVER"] = "dummy"
+os.environ["SDL_AUDIODRIVER"] = "dummy"
+
+import random
+from argparse import ArgumentParser
+from dataclasses import dataclass
+from time import perf_counter
+from typing import Callable
+import pygame as pg
+from constants import FPS, PIXEL_PERFECT_COLLISIONS
+from input_control import PressedKeys
+from sounds_and_music_control import audio_controller
+from states.main_game_state import MainGameState
+
+InputSource = Callable[[int], PressedKeys]  # gets number of the frame and returns keys pressed on this frame
+
+
+def idle_input(frame: int) -> PressedKeys:
+    """Input source which never presses anything"""
+    return PressedKeys()
+
+
+class RandomInput:
+    """Input source which holds random movement keys for random amount of frames and shoots all the time.
+    Has its own random generator so it doesn't change game's random sequence"""
+
+    possible_keys: tuple[int, ...] = (pg.K_w, pg.K_a, pg.K_s, pg.K_d, pg.K_k)
+
+    def __init__(self, seed: int) -> None:
+        self.random_generator = random.Random(seed)
+        self.keys: PressedKeys = PressedKeys()
+        self.frames_left: int = 0
+
+    def __call__(self, frame: int) -> PressedKeys:
+        if self.frames_left <= 0:
+            keys_number: int = self.random_generator.randint(0, 2)
+            self.keys = PressedKeys([pg.K_SPACE, *self.random_generator.sample(self.possible_keys, keys_number)])
+            self.frames_left = self.random_generator.randint(5, 30)
+        self.frames_left -= 1
+        return self.keys
+
+
+@dataclass
+class SimulationResult:
+    seed: int
+    frames: int
+    score: int
+    coins: int
+    game_over: bool
+    elapsed_seconds: float
+
+    @property
+    def frames_per_second(self) -> float:
+        return self.frames / self.elapsed_seconds if self.elapsed_seconds else 0.0
+
+
+class HeadlessSimulation:
+    """Runs MainGameState.update() (and so check_collisions()) as fast as possible without window, drawing and audio.
+    Graphics are loaded once, so one object can run any number of sessions with reset()"""
+
+    def __init__(
+        self,
+        seed: int = 0,
+        input_source: InputSource = idle_input,
+        pixel_perfect_collisions: bool = PIXEL_PERFECT_COLLISIONS,
+    ) -> None:
+        pg.init()
+        # Dummy video driver doesn't open any window, display surface is needed only for convert_alpha()
+        pg.display.set_mode((1, 1))
+        audio_controller.mute()
+
+        self.game = MainGameState()
+        self.game.interpolate = False  # nothing is drawn
+        self.game.pixel_perfect_collisions = pixel_perfect_collisions
+        self.game.setup()
+        self.reset(seed, input_source)
+
+    def reset(self, seed: int, input_source: InputSource = idle_input) -> None:
+        """Start new game session which will be the same for the same seed and input"""
+        self.seed: int = seed
+        self.input_source: InputSource = input_source
+        random.seed(seed)
+        self.game.reset_game()
+        self.game.set_undone()
+        self.game.next = None
+        self.frame: int = 0
+        self.previous_keys: PressedKeys = PressedKeys()
+
+    def is_game_over(self) -> bool:
+        return self.game.done and self.game.next == "game_over"
+
+    def step(self) -> None:
+        """Simulate one frame of the game"""
+        keys: PressedKeys = self.input_source(self.frame)
+        # Newly pressed keys are passed as KEYDOWN events (torpedo launch). There's no pause state so ESC is skipped
+        for key in sorted(keys.keys - self.previous_keys.keys):
+            if key != pg.K_ESCAPE:
+                self.game.get_event(pg.event.Event(pg.KEYDOWN, key=key))
+        self.previous_keys = keys
+
+        self.game.get_keys(keys)
+        self.game.update()
+        self.frame += 1
+
+    def run(self, max_frames: int) -> SimulationResult:
+        """Simulate frames until the game is over or max_frames frames are simulated"""
+        start_time: float = perf_counter()
+        while self.frame < max_frames and not self.is_game_over():
+            self.step()
+        return SimulationResult(
+            self.seed,
+            self.frame,
+            self.game.player.score,
+            self.game.player.coins,
+            self.is_game_over(),
+            perf_counter() - start_time,
+        )
+
+
+def main() -> None:
+    parser = ArgumentParser(description="Run game sessions without window and print simulation throughput")
+    parser.add_argument("--sessions", type=int, default=10, help="number of sessions to run")
+    parser.add_argument("--seed", type=int, default=0, help="seed of the first session (next ones use seed + 1, ...)")
+    parser.add_argument("--max-frames", type=int, default=FPS * 600, help="maximum frames in one session")
+    parser.add_argument("--random-input", action="store_true", help="use random input instead of idle player")
+    parser.add_argument(
+        "--pixel-perfect-collisions",
+        action="store_true",
+        default=PIXEL_PERFECT_COLLISIONS,
+        help="check hits by images' pixels instead of collide rects",
+    )
+    args = parser.parse_args()
+
+    simulation = HeadlessSimulation(pixel_perfect_collisions=args.pixel_perfect_collisions)
+    total_frames: int = 0
+    total_time: float = 0.0
+    for seed in range(args.seed, args.seed + args.sessions):
+        simulation.reset(seed, RandomInput(seed) if args.random_input else idle_input)
+        result: SimulationResult = simulation.run(args.max_frames)
+        total_frames += result.frames
+        total_time += result.elapsed_seconds
+        print(
+            f"seed {result.seed}: {result.frames} frames, score {result.score}, coins {result.coins}, "
+            f"game over: {result.game_over}, {result.frames_per_second:.0f} frames/s"
+        )
+    print(f"total: {total_frames} frames in {total_time:.2f} s ({total_frames / max(total_time, 1e-9):.0f} frames/s)")
+    for name, stats in simulation.game.get_pool_stats().items():
+        print(
+            f"{name}: acquired {stats['acquired']}, hit rate {stats['hit_rate']:.1%}, "
+            f"in use {stats['in_use']}, high-water {stats['high_water']}"
+        )
+
+
+if __name__ == "__main__":
+    main()
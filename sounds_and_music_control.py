@@ -1,5 +1,6 @@
 """This module contains class AudioController which is responsible for all sounds and music in game"""
 
+from concurrent.futures import Executor, Future
 import pygame as pg
 from constants import (
     SHOT_SOUND_VOLUME,
@@ -11,6 +12,7 @@ from constants import (
     BUTTON_CONFIRM_SOUND_VOLUME,
     MENU_MUSIC_VOLUME,
     GAMEPLAY_MUSIC_VOLUME,
+    MUSIC_FADE_TIME,
 )
 
 
@@ -22,30 +24,42 @@ class AudioController:
         self.is_volume_on: int = True
         self.is_music_on: int = True
 
-        self.sounds_dict: dict[str, pg.mixer.Sound] = {
-            "button_change": pg.mixer.Sound(self.SOUNDS_PATH + "button_change.mp3"),
-            "button_confirm": pg.mixer.Sound(self.SOUNDS_PATH + "button_confirm.mp3"),
-            "shot": pg.mixer.Sound(self.SOUNDS_PATH + "shot_sound.mp3"),
-            "explosion": pg.mixer.Sound(self.SOUNDS_PATH + "explosion.mp3"),
-            "torpedo": pg.mixer.Sound(self.SOUNDS_PATH + "torpedo_launch.wav"),
-            "particle": pg.mixer.Sound(self.SOUNDS_PATH + "particle_sound.wav"),
-            "game_over": pg.mixer.Sound(self.SOUNDS_PATH + "game_over.wav"),
+        # sound name -> (file name, volume); sounds are loaded with load_sounds() and can't be played before that
+        self.sounds_files: dict[str, tuple[str, float]] = {
+            "button_change": ("button_change.mp3", BUTTON_CHANGE_SOUND_VOLUME),
+            "button_confirm": ("button_confirm.mp3", BUTTON_CONFIRM_SOUND_VOLUME),
+            "shot": ("shot_sound.mp3", SHOT_SOUND_VOLUME),
+            "explosion": ("explosion.mp3", EXPLOSION_SOUND_VOLUME1),
+            "torpedo": ("torpedo_launch.wav", TORPEDO_SOUND_VOLUME),
+            "particle": ("particle_sound.wav", PARTICLE_SOUND_VOLUME),
+            "game_over": ("game_over.wav", GAME_OVER_SOUND_VOLUME),
         }
-        self.sounds_dict["button_change"].set_volume(BUTTON_CHANGE_SOUND_VOLUME)
-        self.sounds_dict["button_confirm"].set_volume(BUTTON_CONFIRM_SOUND_VOLUME)
-        self.sounds_dict["shot"].set_volume(SHOT_SOUND_VOLUME)
-        self.sounds_dict["explosion"].set_volume(EXPLOSION_SOUND_VOLUME1)
-        self.sounds_dict["torpedo"].set_volume(TORPEDO_SOUND_VOLUME)
-        self.sounds_dict["particle"].set_volume(PARTICLE_SOUND_VOLUME)
-        self.sounds_dict["game_over"].set_volume(GAME_OVER_SOUND_VOLUME)
-
-        self.music_dict: dict[str, pg.mixer.Sound] = {
-            "gameplay": pg.mixer.Sound(self.MUSIC_PATH + "main_theme.wav"),
-            "menu": pg.mixer.Sound(self.MUSIC_PATH + "menu_theme.wav"),
+        self.sounds_dict: dict[str, pg.mixer.Sound] = {}
+
+        # Music is streamed from the file with pg.mixer.music (only small part of it is decoded at a time)
+        self.music_paths: dict[str, str] = {
+            "gameplay": self.MUSIC_PATH + "main_theme.wav",
+            "menu": self.MUSIC_PATH + "menu_theme.wav",
         }
-        self.music_dict["gameplay"].set_volume(GAMEPLAY_MUSIC_VOLUME)
-        self.music_dict["menu"].set_volume(MENU_MUSIC_VOLUME)
+        self.music_volumes: dict[str, float] = {"gameplay": GAMEPLAY_MUSIC_VOLUME, "menu": MENU_MUSIC_VOLUME}
         self.current_music_name = None
+        self.playing_music_name: str | None = None  # differs from current music while old one is fading out
+        self.fade_out_start_time: int | None = None  # pg.time.get_ticks() when fading out of playing music started
+
+    def load_sound(self, sound_name: str) -> pg.mixer.Sound:
+        file_name, volume = self.sounds_files[sound_name]
+        sound: pg.mixer.Sound = pg.mixer.Sound(self.SOUNDS_PATH + file_name)
+        sound.set_volume(volume)
+        self.sounds_dict[sound_name] = sound
+        return sound
+
+    def load_sounds(self, executor: Executor | None = None) -> list[Future[pg.mixer.Sound]]:
+        """Load all sounds (in executor's worker threads if it's passed, then returns their futures)"""
+        if executor is None:
+            for sound_name in self.sounds_files:
+                self.load_sound(sound_name)
+            return []
+        return [executor.submit(self.load_sound, sound_name) for sound_name in self.sounds_files]
 
     def flip_volume_status(self) -> None:
         self.is_volume_on = not self.is_volume_on
@@ -56,12 +70,45 @@ class AudioController:
     def flip_music_status(self) -> None:
         self.is_music_on = not self.is_music_on
         if not self.is_music_on:
-            self.music_dict[self.current_music_name].stop()
+            self.stop_music()
+        elif self.current_music_name is not None:
+            self.start_music()
+
+    def mute(self) -> None:
+        """Turn off all sounds and music (for running the game without audio)"""
+        if self.is_volume_on:
+            self.flip_volume_status()
+        if self.is_music_on:
+            self.stop_music()
+            self.is_music_on = False
+
+    def start_music(self) -> None:
+        """Start streaming current music from the beginning (opening file doesn't decode it, so it's fast)"""
+        pg.mixer.music.load(self.music_paths[self.current_music_name])
+        pg.mixer.music.set_volume(self.music_volumes[self.current_music_name])
+        pg.mixer.music.play(loops=-1, fade_ms=MUSIC_FADE_TIME)
+        self.playing_music_name = self.current_music_name
+        self.fade_out_start_time = None
+
+    def stop_music(self) -> None:
+        pg.mixer.music.stop()
+        self.playing_music_name = None
+        self.fade_out_start_time = None
+
+    def update(self) -> None:
+        """Continue changing music (called every frame): lower volume of old music and start new one after that"""
+        if self.fade_out_start_time is None:
+            return
+        fade_progress: float = (
+            (pg.time.get_ticks() - self.fade_out_start_time) / MUSIC_FADE_TIME if MUSIC_FADE_TIME else 1
+        )
+        if fade_progress < 1:
+            pg.mixer.music.set_volume(self.music_volumes[self.playing_music_name] * (1 - fade_progress))
         else:
-            self.music_dict[self.current_music_name].play(loops=-1)
+            self.start_music()
 
     def play_sound(self, sound_name: str, volume: float = -1) -> None:
-        if self.is_volume_on:
+        if self.is_volume_on and sound_name in self.sounds_dict:
             if volume == -1:
                 self.sounds_dict[sound_name].play()
             else:
@@ -71,15 +118,22 @@ class AudioController:
                 self.sounds_dict[sound_name].set_volume(last_volume)
 
     def stop_sound(self, sound_name: str) -> None:
-        self.sounds_dict[sound_name].stop()
+        if sound_name in self.sounds_dict:
+            self.sounds_dict[sound_name].stop()
 
     def change_music(self, music_name: str) -> None:
+        """Start changing music, it's finished in update() calls so it doesn't stop the game while old music fades out"""
         if music_name != self.current_music_name:
-            if self.current_music_name is not None:
-                self.music_dict[self.current_music_name].stop()
             self.current_music_name: str = music_name
-            if self.is_music_on:
-                self.music_dict[self.current_music_name].play(loops=-1)
+            if not self.is_music_on:
+                return
+            if self.playing_music_name is None:
+                self.start_music()
+            elif music_name == self.playing_music_name:  # changed back while it was fading out
+                self.fade_out_start_time = None
+                pg.mixer.music.set_volume(self.music_volumes[music_name])
+            elif self.fade_out_start_time is None:
+                self.fade_out_start_time = pg.time.get_ticks()
 
 
 pg.mixer.init()
@@ -0,0 +1,47 @@
+"""Module which contains SpatialHash class (uniform grid to quickly find sprites colliding with some rect)"""
+
+from typing import Iterable
+import pygame as pg
+from constants import SPATIAL_HASH_CELL_SIZE
+
+
+class SpatialHash:
+    """Uniform grid over sprites' collide rects (or other rects of them, for example rect for pixel-perfect
+    collisions). Every sprite is stored in all cells its rect touches,
+    so query checks only sprites near the rect. Query returns sprites in the order they were passed to rebuild
+    (so for a group it's the same order as pg.sprite.spritecollide returns them)"""
+
+    def __init__(self, cell_size: int = SPATIAL_HASH_CELL_SIZE) -> None:
+        self.cell_size: int = cell_size
+        self.cells: dict[tuple[int, int], list[int]] = {}  # (column, row) -> indexes of sprites in self.sprites
+        self.sprites: list[pg.sprite.Sprite] = []
+        self.rects: list[pg.Rect] = []  # rect of every sprite in self.sprites
+
+    def get_cells(self, rect: pg.Rect) -> Iterable[tuple[int, int]]:
+        """Returns all cells which rect touches"""
+        cell_size: int = self.cell_size
+        for column in range(rect.left // cell_size, max(rect.left, rect.right - 1) // cell_size + 1):
+            for row in range(rect.top // cell_size, max(rect.top, rect.bottom - 1) // cell_size + 1):
+                yield column, row
+
+    def rebuild(self, sprites: Iterable[pg.sprite.Sprite], rect_attribute: str = "collide_rect") -> None:
+        """Fill grid with sprites by their rects in rect_attribute"""
+        self.cells.clear()
+        self.sprites = list(sprites)
+        self.rects = [getattr(sprite, rect_attribute) for sprite in self.sprites]
+        for ind, rect in enumerate(self.rects):
+            for cell in self.get_cells(rect):
+                if cell in self.cells:
+                    self.cells[cell].append(ind)
+                else:
+                    self.cells[cell] = [ind]
+
+    def query(self, rect: pg.Rect) -> list[pg.sprite.Sprite]:
+        """Returns list of sprites whose rects collide with rect"""
+        if not self.sprites:
+            return []
+        candidates: set[int] = set()
+        for cell in self.get_cells(rect):
+            if cell in self.cells:
+                candidates.update(self.cells[cell])
+        return [self.sprites[ind] for ind in sorted(candidates) if rect.colliderect(self.rects[ind])]
@@ -4,6 +4,7 @@ from sounds_and_music_control import AudioController, audio_controller
 
 
 class State:
+    graphics_folders: tuple[str, ...] = ()  # folders in graphics folder with images which state loads (to preload them)
 
     def __init__(self) -> None:
         self.audio_controller: AudioController = audio_controller
@@ -11,11 +12,14 @@ class State:
         self.next = None
         self.quit = False
         self.previous = None
+        self.resumes_previous: bool = False  # True if state returns to the previous one, which so must be kept
+        self.dirty_rects = None  # rects changed by the last draw call (None if the whole screen could be changed)
+        self.render_alpha: float = 1.0  # part of the tick passed since the last update when state is drawn
 
     def set_undone(self) -> None:
         self.done = False
 
-    def get_event(self) -> None:
+    def get_event(self, event) -> None:
         """Method which handle event in this state"""
         return
 
@@ -23,6 +27,14 @@ class State:
         """Method to load all graphics for this state"""
         return
 
+    def setup(self) -> None:
+        """Load graphics and create rects and objects of this state (called once before its first startup)"""
+        self.load_graphics()
+
+    def release(self) -> None:
+        """Free resources which aren't owned by the state object itself (called when Control removes unused state)"""
+        return
+
     def get_keys(self, keys) -> None:
         """Method which handle pressed keys (pg.key.Scancodewrapper object passed as keys)"""
         return
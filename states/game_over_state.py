@@ -10,9 +10,12 @@ sys.path.append(os.path.dirname(scipt_dir))
 import pygame as pg
 from .base_state import State
 from .menu_button import Button
+from asset_loader import asset_loader
 
 
 class GameOverState(State):
+    graphics_folders: tuple[str, ...] = ("game_over",)
+
     def __init__(self) -> None:
         super().__init__()
 
@@ -22,11 +25,12 @@ class GameOverState(State):
         self.buttons_list[self.current_active_button_ind].change_active()
 
     def load_graphics(self) -> None:
-        self.game_over_title: pg.Surface = pg.image.load("assets/graphics/game_over/game_over.png").convert_alpha()
-        self.game_over_title = pg.transform.rotozoom(self.game_over_title, 0, 0.7)
+        self.game_over_title: pg.Surface = asset_loader.load_image("assets/graphics/game_over/game_over.png", 0.7)
+        self.game_over_title_bg: pg.Surface = asset_loader.load_image("assets/graphics/game_over/title_bg.png", 0.8)
 
-        self.game_over_title_bg: pg.Surface = pg.image.load("assets/graphics/game_over/title_bg.png").convert_alpha()
-        self.game_over_title_bg = pg.transform.rotozoom(self.game_over_title_bg, 0, 0.8)
+    def setup(self) -> None:
+        self.load_graphics()
+        self.setup_rects_and_buttons()
 
     def setup_rects_and_buttons(self) -> None:
         self.game_over_bg_rect: pg.Rect = self.game_over_title_bg.get_rect(center=(721, 150))
@@ -0,0 +1,67 @@
+"""Module which contains state which is shown while game's assets are loading"""
+
+import sys
+import os
+from collections import deque
+from concurrent.futures import Future
+from typing import Any, Callable
+
+# for importing from parent directory
+scipt_dir: str = os.path.dirname(os.path.abspath(__file__))
+sys.path.append(os.path.dirname(scipt_dir))
+
+import pygame as pg
+from .base_state import State
+from cached_font import CachedFont, get_cached_font
+from constants import GAME_SCREEN_HEIGHT, GAME_SCREEN_WIDTH
+
+
+class LoadingState(State):
+    def __init__(self, tasks: list[Future], steps: list[Callable[[], Any]], next_state: str) -> None:
+        """State which shows progress while files are loading in worker threads and then runs steps which need the
+        main thread (one step per frame, so the window stays responsive)
+
+        Args:
+            tasks (list[Future]): loading tasks running in worker threads
+            steps (list[Callable]): functions to call after all tasks are done (for example states' setup)
+            next_state (str): name of the state to go to after the last step
+        """
+        super().__init__()
+        self.tasks: list[Future] = tasks
+        self.steps: deque[Callable[[], Any]] = deque(steps)
+        self.total_work: int = len(tasks) + len(steps)
+        self.next_state: str = next_state
+        self.tasks_checked: bool = False
+        self.font_bauhaus93: CachedFont = get_cached_font("assets/fonts/bauhaus93.ttf", 34)
+        self.progress_bar_rect: pg.Rect = pg.Rect(0, 0, 600, 24)
+        self.progress_bar_rect.center = (GAME_SCREEN_WIDTH // 2, GAME_SCREEN_HEIGHT // 2 + 40)
+
+    def get_progress(self) -> float:
+        done_work: int = sum(task.done() for task in self.tasks) + self.total_work - len(self.tasks) - len(self.steps)
+        return done_work / self.total_work if self.total_work else 1.0
+
+    def update(self) -> None:
+        if not self.tasks_checked:
+            if not all(task.done() for task in self.tasks):
+                return
+            for task in self.tasks:
+                task.result()  # raises exception of the task if loading failed
+            self.tasks_checked = True
+
+        if self.steps:
+            self.steps.popleft()()
+        else:
+            self.done = True
+            self.next = self.next_state
+
+    def draw(self, screen: pg.Surface) -> None:
+        progress: float = self.get_progress()
+        screen.fill("#0A0A23")
+        text_surf: pg.Surface = self.font_bauhaus93.render(f"Loading... {progress:.0%}", True, "#FFD723")
+        screen.blit(
+            text_surf, text_surf.get_rect(midbottom=(self.progress_bar_rect.centerx, self.progress_bar_rect.top - 15))
+        )
+        filled_rect: pg.Rect = self.progress_bar_rect.copy()
+        filled_rect.width = round(self.progress_bar_rect.width * progress)
+        pg.draw.rect(screen, "#0FF4FF", filled_rect)
+        pg.draw.rect(screen, "#FFD723", self.progress_bar_rect, 2)
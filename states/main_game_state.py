@@ -2,25 +2,40 @@
 
 import sys
 import os
-from typing import Callable
+import copy
+import random
+import zlib
+from functools import partial
+from typing import Any, Callable
 
 # for importing from parent directory
 scipt_dir: str = os.path.dirname(os.path.abspath(__file__))
 sys.path.append(os.path.dirname(scipt_dir))
 
 from random import randint
+import numpy as np
 import pygame as pg
+from asset_loader import asset_loader
 from background import GameBackground
+from cached_font import CachedFont, get_cached_font
+from collision_masks import collision_masks
 from .base_state import State
 from constants import (
+    BACKGROUND_SPEED,
     COIN_SPAWN_EVENT_TIMER,
+    DIRTY_RECT_RENDERING,
     ENEMY_SPAWN_EVENT_TIMER,
     EXPLOSION_SOUND_VOLUME2,
     FLYING_HEART_SPAWN_EVENT_TIMER,
+    INTERPOLATION_MAX_DISTANCE,
     MAXIMUM_NUMBER_OF_ENEMIES_ON_THE_SCREEN,
+    PIXEL_PERFECT_COLLISIONS,
     PLANE_EXPLOSION_SIZE_COEFFICIENT,
     PLAYER_RELOAD_TIME,
+    RECORD_REPLAYS,
+    RENDER_INTERPOLATION,
     GAME_SCREEN_WIDTH,
+    GAME_SCREEN_HEIGHT,
     BEST_SCORE_FILE_NAME,
     SCORE_ADD_EVENT_TIMER,
     STAR_SPAWN_EVENT_TIMER,
@@ -33,21 +48,61 @@ from constants import (
     ENEMY_SPAWN_EVENT_CHANCE_DENOMINATOR,
     FLYING_HEART_SPAWN_EVENT_CHANCE_DENOMINATOR,
 )
+from event_scheduler import EventScheduler
+from frame_profiler import Phases, frame_profiler
+from input_control import PressedKeys
 from player import Player
 from objects.explosion import Explosion
-from objects.planes import EnemyPlane, PlayerPlane
-from objects.bullets import PlayerBullet, EnemyBullet
+from objects.planes import EnemyGroup, EnemyPlane, PlayerPlane
+from objects.bullets import PlayerBullets, EnemyBullets, rects_to_boxes
 from objects.flying_objects import Coin, ScoreStar, FlyingHeart
 from objects.super_reload_clock import ReloadTimer
 from objects.torpedo import Torpedo
 from objects.particle import Particle
-from save_load_system import GameSaveLoadSystem
+from objects.pool import PooledSprite
+from renderers import DirtyRectRenderer, FullScreenRenderer
+from replay import ReplayRecorder, save_replay
+from save_load_system import GameSaveLoadSystem, save_load_system
+from spatial_hash import SpatialHash
 
 
 class MainGameState(State):
+    graphics_folders: tuple[str, ...] = (
+        "backgrounds",
+        "bullets",
+        "clock_timer",
+        "explosion",
+        "flying_objects",
+        "particle",
+        "planes",
+        "torpedo",
+    )
+    repeated_events_priority: int = EnemyGroup.fire_priority + 1  # enemies shoot before spawns of the same tick
+
+    # Attributes which change during the game (everything get_snapshot() copies)
+    snapshot_attributes: tuple[str, ...] = (
+        "player",
+        "player_group",
+        "player_bullets",
+        "enemies_group",
+        "enemies_bullets",
+        "torpedo_group",
+        "explosion_group",
+        "coins_group",
+        "score_stars_group",
+        "flying_hearts_group",
+        "particle_effect_group",
+        "game_background",
+        "torpedo_reload_timer",
+        "event_scheduler",
+        "game_over_timer",
+        "last_score_value",
+        "pressed_keys",
+    )
+
     def __init__(self) -> None:
         super().__init__()
-        self.save_load_system: GameSaveLoadSystem = GameSaveLoadSystem()
+        self.save_load_system: GameSaveLoadSystem = save_load_system
 
         self.game_background: GameBackground = GameBackground()  # Class to move and draw game background
 
@@ -55,10 +110,21 @@ class MainGameState(State):
         self.player_group = (
             pg.sprite.GroupSingle()
         )  # Class to control the player (Player plane added after loading graphics)
-        self.player_bullets_group = pg.sprite.Group()  # Class to control player's bullets
-
-        self.enemies_group = pg.sprite.Group()  # Class to control enemies
-        self.enemies_bullets_group = pg.sprite.Group()  # Control all enemies' bullets
+        self.player_bullets = PlayerBullets()  # Class to control player's bullets
+
+        # Spawns and enemies' shots are scheduled at ticks they're due at
+        self.event_scheduler = EventScheduler()
+        self.repeated_events: dict[str, tuple[Callable[[], None], int]] = {  # event -> (handler, period in ticks)
+            "enemy spawn": (self.spawn_enemy, ENEMY_SPAWN_EVENT_TIMER),
+            "coin spawn": (self.spawn_coin, COIN_SPAWN_EVENT_TIMER),
+            "star spawn": (self.spawn_star, STAR_SPAWN_EVENT_TIMER),
+            "flying heart spawn": (self.spawn_flying_heart, FLYING_HEART_SPAWN_EVENT_TIMER),
+            "score add": (self.add_score, SCORE_ADD_EVENT_TIMER),
+        }
+
+        self.enemies_group = EnemyGroup(self.event_scheduler)  # Class to control and move enemies
+        self.enemies_bullets = EnemyBullets()  # Control all enemies' bullets
+        self.enemies_spatial_hash = SpatialHash()  # Grid over enemies' hit rects, rebuilt every frame
 
         self.torpedo_group = pg.sprite.Group()  # Control all torpedos
         self.explosion_group = pg.sprite.Group()  # Control all explosions
@@ -68,12 +134,29 @@ class MainGameState(State):
         self.flying_hearts_group = pg.sprite.Group()  # Controll all flying hearts
         self.particle_effect_group = pg.sprite.Group()  # Controll all particle effects
 
+        self.pressed_keys: pg.key.ScancodeWrapper | PressedKeys = PressedKeys()  # keys from the last get_keys call
+
+        # Moving objects are drawn between their positions before and after the last update (by render_alpha)
+        self.interpolate: bool = RENDER_INTERPOLATION  # must be set before setup()
+        self.interpolated_groups: tuple[pg.sprite.AbstractGroup, ...] = (
+            self.player_group,
+            self.enemies_group,
+            self.torpedo_group,
+            self.coins_group,
+            self.score_stars_group,
+            self.flying_hearts_group,
+            self.particle_effect_group,
+        )
+        self.previous_positions: dict[pg.sprite.Sprite, tuple[int, int]] = {}  # sprite -> its rect's center
+        self.pixel_perfect_collisions: bool = PIXEL_PERFECT_COLLISIONS  # must be set before setup() (masks are made)
+        self.replay_recorder: ReplayRecorder | None = None  # records the current session if it was started by player
         self.set_timers()
 
     def load_graphics(self) -> None:
         PlayerPlane.load_graphics()
-        PlayerBullet.load_graphics()
-        EnemyBullet.load_graphics()
+        EnemyPlane.load_graphics()
+        PlayerBullets.load_graphics()
+        EnemyBullets.load_graphics()
         Torpedo.load_graphics()
         ReloadTimer.load_graphics()
         Explosion.load_graphics()
@@ -81,27 +164,45 @@ class MainGameState(State):
         Particle.load_graphics()
         ScoreStar.load_graphics()
         FlyingHeart.load_graphics()
+        if self.pixel_perfect_collisions:
+            self.load_collision_masks()
         self.extra_life_surfs: list[pg.Surface] = [
-            pg.transform.rotozoom(
-                pg.image.load(f"assets/graphics/flying_objects/hearts/heart{i}.png"), 0, 0.21
-            ).convert_alpha()
-            for i in range(2)
+            asset_loader.load_image(f"assets/graphics/flying_objects/hearts/heart{i}.png", 0.21) for i in range(2)
         ]
 
+    def load_collision_masks(self) -> None:
+        """Make masks of all images which can collide, so they're never made during the game"""
+        collision_masks.add(image for images in PlayerPlane.images.values() for image in images)
+        collision_masks.add(EnemyPlane.images.values())
+        collision_masks.add((PlayerBullets.image, EnemyBullets.image))
+        collision_masks.add(image for images in Coin.images.values() for image in images)
+        # Star has not rotated image until its first animation
+        collision_masks.add(ScoreStar.images + ScoreStar.rotated_images)
+        collision_masks.add(FlyingHeart.images)
+
+    def setup(self) -> None:
+        self.load_graphics()
+        self.setup_rects_and_objects()
+
+    def release(self) -> None:
+        self.save_replay()  # session left from pause is released with the state
+        # Explosion frames scaled for every size are the biggest graphics shared through class attributes
+        Explosion.scaled_images_cache.clear()
+        collision_masks.clear()
+
     def setup_rects_and_objects(self) -> None:
         """Method to load all needed objects and rects after graphic has been loaded"""
         self.player_group.add(PlayerPlane())
-        self.bauhaus_font: pg.font.Font = pg.font.Font("assets/fonts/bauhaus93.ttf", 34)
+        self.bauhaus_font: CachedFont = get_cached_font("assets/fonts/bauhaus93.ttf", 34)
 
         self.get_updated_coin_surf: Callable[..., pg.Surface] = lambda: self.bauhaus_font.render(
             str(self.player.coins).zfill(5), True, "#fee201"
         )
 
         self.player_coins_surf: pg.Surface = self.get_updated_coin_surf()
-        self.player_coins_background: pg.Surface = pg.image.load(
-            "assets/graphics/backgrounds/coin_background.png"
-        ).convert_alpha()
-        self.player_coins_background = pg.transform.rotozoom(self.player_coins_background, 0, 0.4)
+        self.player_coins_background: pg.Surface = asset_loader.load_image(
+            "assets/graphics/backgrounds/coin_background.png", 0.4
+        )
         self.player_coins_background_rect: pg.Rect = self.player_coins_background.get_rect(topleft=(0, 0))
         self.player_coins_rect: pg.Rect = self.player_coins_surf.get_rect(
             center=(self.player_coins_background_rect.centerx + 76, self.player_coins_background_rect.centery - 4)
@@ -123,10 +224,70 @@ class MainGameState(State):
             "assets/fonts/bauhaus93.ttf",
         )
 
-    def reset_game(self) -> None:
-        self.enemies_bullets_group.empty()
+        if DIRTY_RECT_RENDERING:
+            static_background: pg.Surface = pg.Surface((GAME_SCREEN_WIDTH, GAME_SCREEN_HEIGHT)).convert()
+            self.game_background.draw_background(static_background)
+            self.renderer: DirtyRectRenderer | FullScreenRenderer = DirtyRectRenderer(static_background)
+        else:
+            self.renderer = FullScreenRenderer(self.game_background)
+        self.setup_phases()
+
+    def setup_phases(self) -> None:
+        """Lists phases of update and draw in order of calling, so frame profiler can measure every one of them"""
+        self.update_phases: Phases = [("interpolation", self.store_previous_positions)] if self.interpolate else []
+        self.update_phases += [
+            ("events", self.fire_events),
+        ]
+        if not DIRTY_RECT_RENDERING:  # background doesn't scroll in this mode
+            self.update_phases.append(("background", self.game_background.move_background))
+        self.update_phases += [
+            ("player", self.update_player),
+            ("enemies", self.enemies_group.update),
+            ("torpedos", self.torpedo_group.update),
+            ("torpedo reload timer", self.torpedo_reload_timer.update),
+            ("coins", self.coins_group.update),
+            ("score stars", self.score_stars_group.update),
+            ("flying hearts", self.flying_hearts_group.update),
+            ("player bullets", self.player_bullets.update),
+            ("enemies bullets", self.enemies_bullets.update),
+            ("explosions", self.explosion_group.update),
+            ("particles", self.particle_effect_group.update),
+            ("collisions", self.check_collisions),
+            ("score text", self.update_score_surf),
+            ("game over timer", self.update_game_over_timer),
+        ]
+        self.draw_phases: Phases = [
+            ("draw background", self.draw_background),
+            ("draw HUD", self.draw_hud),
+            ("draw particles", partial(self.draw_group, self.particle_effect_group)),
+            ("draw reload timer", lambda: self.renderer.draw_sprites(self.torpedo_reload_timer.get_blits())),
+            ("draw player bullets", partial(self.draw_bullets, self.player_bullets)),
+            ("draw enemies bullets", partial(self.draw_bullets, self.enemies_bullets)),
+            ("draw torpedos", partial(self.draw_group, self.torpedo_group)),
+            ("draw coins", partial(self.draw_group, self.coins_group)),
+            ("draw score stars", partial(self.draw_group, self.score_stars_group)),
+            ("draw flying hearts", partial(self.draw_group, self.flying_hearts_group)),
+            ("draw player", self.draw_player),
+            ("draw enemies", partial(self.draw_group, self.enemies_group)),
+            ("draw explosions", partial(self.draw_group, self.explosion_group)),
+        ]
+        self.set_phase_functions()
+
+    def set_phase_functions(self) -> None:
+        """Take phases' functions from frame profiler (timed ones if it's enabled)"""
+        self.update_functions: list[Callable[[], None]] = frame_profiler.get_phase_functions(self.update_phases)
+        draw_phases: Phases = self.draw_phases
+        if frame_profiler.enabled:
+            draw_phases = draw_phases + [("draw profiler", self.draw_profiler_overlay)]
+        self.draw_functions: list[Callable[[], None]] = frame_profiler.get_phase_functions(draw_phases)
+
+    def reset_game(self, seed: int | None = None) -> None:
+        """Start new game (the same for the same seed and player's input if seed is passed)"""
+        if seed is not None:
+            random.seed(seed)
+        self.enemies_bullets.empty()
         self.enemies_group.empty()
-        self.player_bullets_group.empty()
+        self.player_bullets.empty()
         self.torpedo_group.empty()
         self.explosion_group.empty()
         self.coins_group.empty()
@@ -134,6 +295,7 @@ class MainGameState(State):
         self.particle_effect_group.empty()
         self.flying_hearts_group.empty()
         self.player_group.sprite.reset()
+        self.previous_positions = {}
         self.player.reset_coins()
         self.player.reset_score()
         self.player.recover_extra_life()
@@ -146,33 +308,125 @@ class MainGameState(State):
 
         self.set_timers()
 
+    def get_pool_stats(self) -> dict[str, dict[str, float]]:
+        """Returns reuse statistics (acquired, hit_rate, in_use, high_water) for every often created object"""
+        return {
+            "player_bullets": self.player_bullets.get_stats(),
+            "enemies_bullets": self.enemies_bullets.get_stats(),
+            "explosions": Explosion.pool.get_stats(),
+            "particles": Particle.pool.get_stats(),
+            "torpedos": Torpedo.pool.get_stats(),
+        }
+
     def update_record(self) -> None:
         current_player_score: int = self.player.score
         last_player_record: int = self.save_load_system.load_game_data({BEST_SCORE_FILE_NAME: 0})[BEST_SCORE_FILE_NAME]
         if current_player_score > last_player_record:
             self.save_load_system.save_game_data({BEST_SCORE_FILE_NAME: current_player_score})
 
+    def get_checksum(self) -> int:
+        """Returns checksum of the game state (to check that replay is played the same way it was recorded)"""
+        game_state: tuple = (
+            self.player.score,
+            self.player.coins,
+            self.player.extra_life,
+            [tuple(sprite.rect) for group in self.interpolated_groups for sprite in group],
+            [tuple(sprite.rect) for sprite in self.explosion_group],
+            self.player_bullets.positions[: self.player_bullets.count].tobytes(),
+            self.enemies_bullets.positions[: self.enemies_bullets.count].tobytes(),
+            self.torpedo_reload_timer.reload_time,
+            self.game_over_timer,
+            random.getstate(),
+        )
+        return zlib.crc32(repr(game_state).encode())
+
+    def get_snapshot(self) -> dict[str, Any]:
+        """Returns copy of everything which changes during the game and state of random generator"""
+        values: dict[str, Any] = {name: getattr(self, name) for name in self.snapshot_attributes}
+        snapshot: dict[str, Any] = copy.deepcopy(values, self.__get_shared_objects(values.values()))
+        snapshot["random_state"] = random.getstate()
+        return snapshot
+
+    def load_snapshot(self, snapshot: dict[str, Any]) -> None:
+        """Return the game to the moment when snapshot was taken (the same objects are kept, only their state changes,
+        so phases' functions stay valid and snapshot can be loaded again)"""
+        values: dict[str, Any] = {name: snapshot[name] for name in self.snapshot_attributes}
+        values = copy.deepcopy(values, self.__get_shared_objects(values.values()))
+        for name, value in values.items():
+            current_value: Any = getattr(self, name)
+            if isinstance(current_value, pg.sprite.AbstractGroup):
+                current_value.empty()
+                sprites: list[pg.sprite.Sprite] = value.sprites()
+                value.empty()
+                for sprite in sprites:
+                    if isinstance(sprite, PooledSprite):
+                        sprite.pool.adopt(sprite)
+                current_value.add(*sprites)
+            elif hasattr(current_value, "__dict__"):
+                vars(current_value).update(vars(value))
+            else:
+                setattr(self, name, value)
+        random.setstate(snapshot["random_state"])
+        self.previous_positions = {}
+        self.player_coins_surf = self.get_updated_coin_surf()
+        self.player_score_surf = self.get_updated_score_surf()
+        self.renderer.invalidate()
+
+    @staticmethod
+    def __get_shared_objects(values: Any) -> dict[int, Any]:
+        """Returns memo for copy.deepcopy with graphics and fonts of all objects in values (they're shared and never
+        changed, so snapshots reference them instead of copying)"""
+        shared_objects: dict[int, Any] = {}
+        objects: list[Any] = [value for value in values if hasattr(value, "__dict__")]
+        for game_object in objects:  # objects found in groups are added to the end of the list
+            if isinstance(game_object, pg.sprite.AbstractGroup):
+                objects.extend(game_object.sprites())
+                continue
+            for attribute in vars(game_object).values():
+                if isinstance(attribute, pg.sprite.AbstractGroup):
+                    objects.append(attribute)
+                elif isinstance(attribute, (pg.Surface, pg.font.Font)) or (
+                    isinstance(attribute, list) and attribute and isinstance(attribute[0], pg.Surface)
+                ):
+                    shared_objects[id(attribute)] = attribute
+        return shared_objects
+
     def startup(self) -> None:
         self.audio_controller.change_music("gameplay")
+        self.renderer.invalidate()  # other state has drawn over the screen
+        # Control doesn't pass keys to this state before its first update, so keys of the previous session (or of the
+        # paused tick) mustn't move the plane (replay plays this tick with no keys too)
+        self.pressed_keys = PressedKeys()
         if self.previous != "pause":
-            self.reset_game()
+            self.save_replay()  # session left from pause (to home) didn't get to cleanup() to save it
+            seed: int = random.randrange(2**32)
+            self.reset_game(seed)
+            if RECORD_REPLAYS:
+                self.replay_recorder = ReplayRecorder(seed)
+
+    def save_replay(self) -> None:
+        """Save replay of the current session (if it's recorded) and stop recording"""
+        if self.replay_recorder is not None:
+            try:
+                save_replay(self.replay_recorder.replay)
+            except OSError:
+                pass  # replay isn't needed to continue the game
+            self.replay_recorder = None
 
     def cleanup(self) -> None:
         self.update_record()
+        if self.next == "pause":
+            if self.replay_recorder is not None:
+                self.replay_recorder.end_tick(self, paused=True)
+        else:
+            self.save_replay()
 
     def set_timers(self) -> None:
-        self.enemy_spawn_event_timer: int = ENEMY_SPAWN_EVENT_TIMER
-        self.coin_spawn_event_timer: int = COIN_SPAWN_EVENT_TIMER
-        self.star_spawn_event_timer: int = STAR_SPAWN_EVENT_TIMER
-        self.flying_heart_spawn_event_timer: int = FLYING_HEART_SPAWN_EVENT_TIMER
-        self.score_add_event_timer: int = SCORE_ADD_EVENT_TIMER
-
-    def update_timers(self) -> None:
-        self.enemy_spawn_event_timer -= 1
-        self.coin_spawn_event_timer -= 1
-        self.star_spawn_event_timer -= 1
-        self.flying_heart_spawn_event_timer -= 1
-        self.score_add_event_timer -= 1
+        """Clear the scheduler and schedule the first repeated events (their order is the order of firing them if
+        they're due at the same tick)"""
+        self.event_scheduler.reset()
+        for order, (event, (_, period)) in enumerate(self.repeated_events.items()):
+            self.event_scheduler.schedule(period, event, self.repeated_events_priority, order)
 
     def get_event(self, event: pg.event.Event) -> None:
         if event.type == pg.KEYDOWN:
@@ -180,96 +434,148 @@ class MainGameState(State):
                 self.audio_controller.play_sound("button_change")
                 self.next = "pause"
                 self.done = True
+            if event.key == pg.K_F3:
+                frame_profiler.toggle()
+                self.set_phase_functions()
+            if event.key == pg.K_k and self.replay_recorder is not None:
+                self.replay_recorder.press_torpedo()
             if (
                 self.torpedo_reload_timer.reload_time == 0
                 and self.player.coins >= TORPEDO_COIN_PRICE
                 and event.key == pg.K_k
             ):
                 self.audio_controller.play_sound("torpedo")
-                self.torpedo_group.add(Torpedo(*self.player_group.sprite.get_bullet_position()))
+                self.torpedo_group.add(Torpedo.acquire(*self.player_group.sprite.get_bullet_position()))
                 self.torpedo_reload_timer.set_timer()
                 self.player.add_to_coins(-TORPEDO_COIN_PRICE)
                 self.player_coins_surf = self.get_updated_coin_surf()
 
-    def manage_own_events(self) -> None:
-        if self.enemy_spawn_event_timer <= 0:
-            if not randint(0, ENEMY_SPAWN_EVENT_CHANCE_DENOMINATOR - 1):
-                if len(self.enemies_group) < MAXIMUM_NUMBER_OF_ENEMIES_ON_THE_SCREEN:
-                    self.enemies_group.add(EnemyPlane())
-            self.enemy_spawn_event_timer = ENEMY_SPAWN_EVENT_TIMER
-
-        if self.coin_spawn_event_timer <= 0:
-            if not randint(0, COIN_SPAWN_EVENT_CHANCE_DENOMINATOR - 1):
-                self.coins_group.add(Coin())
-            self.coin_spawn_event_timer = COIN_SPAWN_EVENT_TIMER
-
-        if self.star_spawn_event_timer <= 0:
-            if not randint(0, STAR_SPAWN_EVENT_CHANCE_DENOMINATOR - 1):
-                self.score_stars_group.add(ScoreStar())
-            self.star_spawn_event_timer = STAR_SPAWN_EVENT_TIMER
-
-        if self.flying_heart_spawn_event_timer <= 0:
-            if not randint(0, FLYING_HEART_SPAWN_EVENT_CHANCE_DENOMINATOR - 1):
-                self.flying_hearts_group.add(FlyingHeart())
-            self.flying_heart_spawn_event_timer = FLYING_HEART_SPAWN_EVENT_TIMER
-
-        if self.score_add_event_timer <= 0:
-            self.player.add_to_score(randint(2, 5))
-            self.score_add_event_timer = SCORE_ADD_EVENT_TIMER
-
-    def get_keys(self, keys: pg.key.ScancodeWrapper) -> None:
+    def spawn_enemy(self) -> None:
+        if not randint(0, ENEMY_SPAWN_EVENT_CHANCE_DENOMINATOR - 1):
+            if len(self.enemies_group) < MAXIMUM_NUMBER_OF_ENEMIES_ON_THE_SCREEN:
+                self.enemies_group.add(EnemyPlane())
+
+    def spawn_coin(self) -> None:
+        if not randint(0, COIN_SPAWN_EVENT_CHANCE_DENOMINATOR - 1):
+            self.coins_group.add(Coin())
+
+    def spawn_star(self) -> None:
+        if not randint(0, STAR_SPAWN_EVENT_CHANCE_DENOMINATOR - 1):
+            self.score_stars_group.add(ScoreStar())
+
+    def spawn_flying_heart(self) -> None:
+        if not randint(0, FLYING_HEART_SPAWN_EVENT_CHANCE_DENOMINATOR - 1):
+            self.flying_hearts_group.add(FlyingHeart())
+
+    def add_score(self) -> None:
+        self.player.add_to_score(randint(2, 5))
+
+    def fire_events(self) -> None:
+        """Start the next tick and fire all events due at it (enemies' shots, then repeated events)"""
+        self.event_scheduler.advance()
+        for event, order in self.event_scheduler.pop_due():
+            if event == EnemyGroup.fire_event:
+                self.enemies_group.fire(order, self.enemies_bullets)
+            else:
+                handler, period = self.repeated_events[event]
+                handler()
+                self.event_scheduler.schedule(
+                    self.event_scheduler.tick + period, event, self.repeated_events_priority, order
+                )
+
+    def get_keys(self, keys: pg.key.ScancodeWrapper | PressedKeys) -> None:
+        self.pressed_keys = keys
+        if self.replay_recorder is not None:
+            self.replay_recorder.set_keys(keys)
         # handle keys
         if keys[pg.K_SPACE] and self.player_group.sprite.can_shoot():
             self.audio_controller.play_sound("shot")
             self.player_group.sprite.set_reload_time(PLAYER_RELOAD_TIME)
-            self.player_bullets_group.add(PlayerBullet(*self.player_group.sprite.get_bullet_position()))
+            self.player_bullets.add(*self.player_group.sprite.get_bullet_position())
+
+    def __get_hit_rect(self, sprite: pg.sprite.Sprite) -> pg.Rect:
+        """Returns rect which finds sprite's collisions (rect of the whole image if collisions are pixel-perfect)"""
+        return sprite.rect if self.pixel_perfect_collisions else sprite.collide_rect
 
-        # Handle enemy shooting
-        for enemy in self.enemies_group.sprites():
-            if enemy.can_shoot():
-                self.enemies_bullets_group.add(EnemyBullet(*enemy.get_bullet_position()))
-                enemy.update_reload_time()
+    def __is_hit(self, sprite: pg.sprite.Sprite, other_sprite: pg.sprite.Sprite) -> bool:
+        """Check sprites whose hit rects collide (their images' pixels if collisions are pixel-perfect)"""
+        return not self.pixel_perfect_collisions or collision_masks.overlap(
+            sprite.image, sprite.rect.topleft, other_sprite.image, other_sprite.rect.topleft
+        )
+
+    def __find_bullets_hits(self, bullets: PlayerBullets | EnemyBullets, sprites: list) -> np.ndarray:
+        """For every bullet returns index of the first sprite it hits or -1"""
+        if not self.pixel_perfect_collisions:
+            return bullets.find_first_collisions(rects_to_boxes(sprite.collide_rect for sprite in sprites))
+        # Bullets' and sprites' image rects find candidates, only their masks are checked
+        candidates: np.ndarray = bullets.get_collisions(
+            rects_to_boxes(sprite.rect for sprite in sprites), bullets.image_box_offset
+        )
+        hits: np.ndarray = np.full(len(bullets), -1)
+        for bullet_ind in np.flatnonzero(candidates.any(axis=1)).tolist():
+            bullet_position: tuple[int, int] = tuple(bullets.positions[bullet_ind].tolist())
+            for sprite_ind in np.flatnonzero(candidates[bullet_ind]).tolist():
+                sprite: pg.sprite.Sprite = sprites[sprite_ind]
+                if collision_masks.overlap(bullets.image, bullet_position, sprite.image, sprite.rect.topleft):
+                    hits[bullet_ind] = sprite_ind
+                    break
+        return hits
 
     def __get_sprites_collided_with_player(self, group: pg.sprite.Group, kill_sprites: bool = True) -> list:
         """Returns a list of sprites of passed group which colliding with player"""
-        return pg.sprite.spritecollide(
-            self.player_group.sprite,
-            group,
-            kill_sprites,
-            lambda pl, group_object: pl.collide_rect.colliderect(group_object.collide_rect),
-        )
+        player_plane: PlayerPlane = self.player_group.sprite
+        group_sprites: list = group.sprites()
+        collided_sprites: list = [
+            group_sprites[ind]
+            for ind in self.__get_hit_rect(player_plane).collidelistall(
+                [self.__get_hit_rect(group_object) for group_object in group_sprites]
+            )
+            if self.__is_hit(player_plane, group_sprites[ind])
+        ]
+        if kill_sprites:
+            for group_object in collided_sprites:
+                group_object.kill()
+        return collided_sprites
+
+    def __get_enemies_collided_with_player(self) -> list[EnemyPlane]:
+        """Returns a list of alive enemies which colliding with player and kill them"""
+        player_plane: PlayerPlane = self.player_group.sprite
+        collided_planes: list[EnemyPlane] = [
+            enemy
+            for enemy in self.enemies_spatial_hash.query(self.__get_hit_rect(player_plane))
+            # enemies killed by bullets or torpedo in this frame are still in the grid
+            if enemy.alive() and self.__is_hit(player_plane, enemy)
+        ]
+        for enemy in collided_planes:
+            enemy.kill()
+        return collided_planes
 
     def __spawn_particle(self, rect_center: tuple[int, int]) -> None:
         self.audio_controller.play_sound("particle")
-        self.particle_effect_group.add(Particle(rect_center))
+        self.particle_effect_group.add(Particle.acquire(rect_center))
 
     def check_collisions(self) -> None:
         killed_enemies: list[EnemyPlane] = []  # list which collects every killed enemy
-        for player_bullet in self.player_bullets_group.sprites():
-            killed_by_this_bullet: list[EnemyPlane] = pg.sprite.spritecollide(
-                player_bullet,
-                self.enemies_group,
-                False,
-                lambda bull, enem: bull.collide_rect.colliderect(enem.collide_rect),
-            )  # get list of enemies which collide with bullet
-            if killed_by_this_bullet:
-                player_bullet.kill()
-                killed_enemies.append(killed_by_this_bullet[0])
+        self.enemies_spatial_hash.rebuild(
+            self.enemies_group, "rect" if self.pixel_perfect_collisions else "collide_rect"
+        )
+        if self.enemies_group and self.player_bullets:
+            enemies: list[EnemyPlane] = self.enemies_group.sprites()
+            # index of the first enemy which collides with bullet for every bullet (-1 if there's no such enemy)
+            hit_enemies_inds: np.ndarray = self.__find_bullets_hits(self.player_bullets, enemies)
+            hit_bullets: np.ndarray = hit_enemies_inds >= 0
+            killed_enemies.extend(enemies[ind] for ind in hit_enemies_inds[hit_bullets].tolist())
+            self.player_bullets.remove(hit_bullets)
 
         for torpedo in self.torpedo_group:
             if torpedo.is_ready_to_explode():
                 explosion_collide_rect: pg.Rect = torpedo.get_explosion_rect()
-                killed_enemies.extend(
-                    pg.sprite.spritecollide(
-                        torpedo,
-                        self.enemies_group,
-                        False,
-                        lambda _, enem: enem.collide_rect.colliderect(explosion_collide_rect),
-                    )
-                )
+                killed_enemies.extend(self.enemies_spatial_hash.query(explosion_collide_rect))
                 torpedo.kill()
                 self.audio_controller.play_sound("explosion", EXPLOSION_SOUND_VOLUME2)
-                self.explosion_group.add(Explosion(explosion_collide_rect.center, TORPEDO_EXPLOSION_SIZE_COEFFICIENT))
+                self.explosion_group.add(
+                    Explosion.acquire(explosion_collide_rect.center, TORPEDO_EXPLOSION_SIZE_COEFFICIENT)
+                )
         if len(self.torpedo_group) == 0:
             self.audio_controller.stop_sound("torpedo")
         killed_enemies = [enemy for enemy in killed_enemies if not enemy.is_immortal]
@@ -278,24 +584,29 @@ class MainGameState(State):
         for killed_enemy in killed_enemies:
             killed_enemy.kill()
             self.player.add_to_score(randint(ENEMY_SCORE_RANGE[0], ENEMY_SCORE_RANGE[1]))
-            self.explosion_group.add(Explosion(killed_enemy.get_rects_center(), PLANE_EXPLOSION_SIZE_COEFFICIENT))
+            self.explosion_group.add(
+                Explosion.acquire(killed_enemy.get_rects_center(), PLANE_EXPLOSION_SIZE_COEFFICIENT)
+            )
 
         if not self.player_group.sprite.immortal_timer:  # if player can be damaged now
             player_damaged = False
-            hit_bullets: list[EnemyBullet] = self.__get_sprites_collided_with_player(self.enemies_bullets_group)
-            if hit_bullets:
+            hit_bullets: np.ndarray = self.__find_bullets_hits(self.enemies_bullets, [self.player_group.sprite]) == 0
+            if hit_bullets.any():
+                self.enemies_bullets.remove(hit_bullets)
                 player_damaged = True
             else:  # if player still has immortal status
-                collided_planes: list[EnemyPlane] = self.__get_sprites_collided_with_player(self.enemies_group)
+                collided_planes: list[EnemyPlane] = self.__get_enemies_collided_with_player()
                 if collided_planes:
                     dead_enemy = collided_planes[0]
-                    self.explosion_group.add(Explosion(dead_enemy.rect.center, PLANE_EXPLOSION_SIZE_COEFFICIENT))
+                    self.explosion_group.add(
+                        Explosion.acquire(dead_enemy.rect.center, PLANE_EXPLOSION_SIZE_COEFFICIENT)
+                    )
                     player_damaged = True
 
             if player_damaged:
                 self.audio_controller.play_sound("explosion", EXPLOSION_SOUND_VOLUME2)
                 self.explosion_group.add(
-                    Explosion(self.player_group.sprite.rect.center, PLAYER_PLANE_EXPLOSION_SIZE_COEFFICIENT)
+                    Explosion.acquire(self.player_group.sprite.rect.center, PLAYER_PLANE_EXPLOSION_SIZE_COEFFICIENT)
                 )
                 if self.player.extra_life:
                     self.player_group.sprite.make_immortal()
@@ -322,47 +633,79 @@ class MainGameState(State):
                 if not self.player.extra_life:
                     self.player.recover_extra_life()
 
-    def update(self) -> None:
-        """Method which updates all game with its logic"""
-        self.update_timers()
-        self.manage_own_events()
-        self.game_background.move_background()
-        self.player_group.update()
-        self.enemies_group.update()
-        self.torpedo_group.update()
-        self.torpedo_reload_timer.update()
-        self.coins_group.update()
-        self.score_stars_group.update()
-        self.flying_hearts_group.update()
-        self.player_bullets_group.update()
-        self.enemies_bullets_group.update()
-        self.explosion_group.update()
-        self.particle_effect_group.update()
-        self.check_collisions()
-        # update score surf if score was changed
+    def store_previous_positions(self) -> None:
+        self.previous_positions = {
+            sprite: sprite.rect.center for group in self.interpolated_groups for sprite in group.sprites()
+        }
+
+    def update_player(self) -> None:
+        self.player_group.update(self.pressed_keys)
+
+    def update_score_surf(self) -> None:
+        """Render score surf again if score was changed"""
         if self.player.score != self.last_score_value:
             self.last_score_value = self.player.score
             self.player_score_surf = self.get_updated_score_surf()
+
+    def update_game_over_timer(self) -> None:
         self.game_over_timer -= 1 if self.game_over_timer != -1 else 0
         if self.game_over_timer == 0:
             self.done = True
             self.next = "game_over"
 
-    def draw(self, screen) -> None:
-        self.game_background.draw_background(screen)
-        screen.blit(self.player_coins_background, self.player_coins_background_rect)
-        screen.blit(self.player_coins_surf, self.player_coins_rect)
-        screen.blit(self.player_score_surf, self.player_score_rect)
-        screen.blit(self.extra_life_surfs[self.player.extra_life], self.extra_life_rect)
-        self.particle_effect_group.draw(screen)
-        self.torpedo_reload_timer.draw(screen)
-        self.player_bullets_group.draw(screen)
-        self.enemies_bullets_group.draw(screen)
-        self.torpedo_group.draw(screen)
-        self.coins_group.draw(screen)
-        self.score_stars_group.draw(screen)
-        self.flying_hearts_group.draw(screen)
+    def update(self) -> None:
+        """Method which updates all game with its logic (phases are listed in setup_phases)"""
+        for update_function in self.update_functions:
+            update_function()
+        if self.replay_recorder is not None:
+            self.replay_recorder.end_tick(self)
+
+    def get_interpolation_offset(self, speed: float) -> int:
+        """Returns shift from current position to the drawn one for objects moving with this speed (px per tick)"""
+        return -round(speed * (1 - self.render_alpha)) if self.interpolate else 0
+
+    def draw_background(self) -> None:
+        self.renderer.draw_background(self.get_interpolation_offset(-BACKGROUND_SPEED))
+
+    def draw_hud(self) -> None:
+        self.renderer.draw_static(self.player_coins_background, self.player_coins_background_rect)
+        self.renderer.draw_static(self.player_coins_surf, self.player_coins_rect)
+        self.renderer.draw_static(self.player_score_surf, self.player_score_rect)
+        self.renderer.draw_static(self.extra_life_surfs[self.player.extra_life], self.extra_life_rect)
+
+    def draw_group(self, group: pg.sprite.AbstractGroup) -> None:
+        self.renderer.draw_sprites(self.__get_group_blits(group))
+
+    def draw_bullets(self, bullets: PlayerBullets | EnemyBullets) -> None:
+        self.renderer.draw_sprites(bullets.get_blits(self.get_interpolation_offset(bullets.speed)))
+
+    def draw_player(self) -> None:
         if self.game_over_timer == -1:
-            self.player_group.draw(screen)
-        self.enemies_group.draw(screen)
-        self.explosion_group.draw(screen)
+            self.draw_group(self.player_group)
+
+    def draw_profiler_overlay(self) -> None:
+        overlay: pg.Surface = frame_profiler.get_overlay()
+        self.renderer.draw_sprites([(overlay, overlay.get_rect(bottomleft=(10, GAME_SCREEN_HEIGHT - 10)))])
+
+    def draw(self, screen) -> None:
+        """Method which draws all game (phases are listed in setup_phases)"""
+        self.renderer.begin_frame(screen)
+        for draw_function in self.draw_functions:
+            draw_function()
+        self.dirty_rects = self.renderer.end_frame()
+
+    def __get_group_blits(self, group: pg.sprite.AbstractGroup) -> list[tuple[pg.Surface, pg.Rect]]:
+        if not self.interpolate or self.render_alpha >= 1:
+            return [(sprite.image, sprite.rect) for sprite in group]
+        not_passed_part: float = 1 - self.render_alpha  # part of the last update's movement which isn't drawn yet
+        blits: list[tuple[pg.Surface, pg.Rect]] = []
+        for sprite in group:
+            rect: pg.Rect = sprite.rect
+            previous_center: tuple[int, int] | None = self.previous_positions.get(sprite)
+            if previous_center is not None:
+                delta_x: int = previous_center[0] - rect.centerx
+                delta_y: int = previous_center[1] - rect.centery
+                if abs(delta_x) + abs(delta_y) <= INTERPOLATION_MAX_DISTANCE:
+                    rect = rect.move(round(delta_x * not_passed_part), round(delta_y * not_passed_part))
+            blits.append((sprite.image, rect))
+        return blits
@@ -1,13 +1,14 @@
 """Module which contains base class for menu button"""
 
 import pygame as pg
+from asset_loader import asset_loader
 
 
 class Button:
 
     def load_graphics(self, normal_button_path, active_button_path) -> None:
-        self.image_normal: pg.Surface = pg.image.load(normal_button_path).convert_alpha()
-        self.image_active: pg.Surface = pg.image.load(active_button_path).convert_alpha()
+        self.image_normal: pg.Surface = asset_loader.load_image(normal_button_path)
+        self.image_active: pg.Surface = asset_loader.load_image(active_button_path)
 
     def __init__(self, x_pos_center, y_pos_center, normal_button_path, active_button_path) -> None:
         self.load_graphics(normal_button_path, active_button_path)
@@ -11,13 +11,16 @@ sys.path.append(os.path.dirname(scipt_dir))
 import pygame as pg
 from .base_state import State
 from .menu_button import Button
-from save_load_system import GameSaveLoadSystem
+from asset_loader import asset_loader
+from save_load_system import GameSaveLoadSystem, save_load_system
 from constants import BEST_SCORE_FILE_NAME, GAME_SCREEN_HEIGHT, GAME_SCREEN_WIDTH
 
 
 class MenuState(State):
+    graphics_folders: tuple[str, ...] = ("menu",)
+
     def __init__(self) -> None:
-        self.save_load_system = GameSaveLoadSystem()
+        self.save_load_system: GameSaveLoadSystem = save_load_system
         self.font_bauhaus93: pg.font.Font = pg.font.Font("assets/fonts/bauhaus93.ttf", 34)
         self.scholarly_ambition: pg.font.Font = pg.font.Font("assets/fonts/scholarly_ambition.ttf", 28)
         super().__init__()
@@ -28,23 +31,25 @@ class MenuState(State):
         self.buttons_list[self.current_active_button_ind].change_active()
 
     def load_graphics(self) -> None:
-        self.background: pg.Surface = pg.image.load("assets/graphics/menu/menu_bg.png").convert_alpha()
-        self.game_title: pg.Surface = pg.image.load("assets/graphics/menu/game_title.png").convert_alpha()
-        self.game_title = pg.transform.rotozoom(self.game_title, 0, 0.8)
+        self.background: pg.Surface = asset_loader.load_image("assets/graphics/menu/menu_bg.png")
+        self.game_title: pg.Surface = asset_loader.load_image("assets/graphics/menu/game_title.png", 0.8)
 
-        self.game_title_bg: pg.Surface = pg.image.load("assets/graphics/menu/title_bg.png").convert_alpha()
-        self.game_title_bg = pg.transform.rotozoom(self.game_title_bg, 0, 0.8)
+        self.game_title_bg: pg.Surface = asset_loader.load_image("assets/graphics/menu/title_bg.png", 0.8)
 
-        self.buttons_bg: pg.Surface = pg.image.load("assets/graphics/menu/buttons_bg.png")
+        self.buttons_bg: pg.Surface = asset_loader.load_image("assets/graphics/menu/buttons_bg.png")
         self.author_sign_surf_parts: list[pg.Surface] = [
             self.scholarly_ambition.render(part, True, "#0FF4FF")
             for part in ("Made with", "By Heir-of-God", "https://github.com/Heir-of-God")
         ]
-        self.blue_heart: pg.Surface = pg.image.load("assets/graphics/menu/blue_heart.png")
+        self.blue_heart: pg.Surface = asset_loader.load_image("assets/graphics/menu/blue_heart.png")
         self.blue_heart_surf = pg.transform.scale_by(
             self.blue_heart, self.author_sign_surf_parts[0].get_height() / self.blue_heart.get_height()
         ).convert_alpha()
 
+    def setup(self) -> None:
+        self.load_graphics()
+        self.setup_rects_and_buttons()
+
     def setup_rects_and_buttons(self) -> None:
         self.game_title_bg_rect: pg.Rect = self.game_title_bg.get_rect(center=(721, 150))
         self.buttons_bg_rect: pg.Rect = self.buttons_bg.get_rect(center=(721, 510))
@@ -92,20 +97,22 @@ class MenuState(State):
             "assets/graphics/menu/music_button_off_active.png",
         )
 
+        self.volume_buttons: list[Button] = [self.volume_button_on, self.volume_button_off]
+        self.music_buttons: list[Button] = [self.music_button_on, self.music_button_off]
+        # Menu can be created again after it was released, so buttons show current audio settings
+        self.current_volume_button_ind = int(not self.audio_controller.is_volume_on)
+        self.current_music_button_ind = int(not self.audio_controller.is_music_on)
+        # Hidden buttons are active beforehand because they're shown only instead of active (chosen) button
+        self.volume_buttons[int(not self.current_volume_button_ind)].change_active()
+        self.music_buttons[int(not self.current_music_button_ind)].change_active()
         self.buttons_list: list[Button] = [
             self.play_button,
             self.leave_button,
-            self.volume_button_on,
-            self.music_button_on,
+            self.volume_buttons[self.current_volume_button_ind],
+            self.music_buttons[self.current_music_button_ind],
         ]
-        self.music_button_off.change_active()
-        self.volume_button_off.change_active()
-        self.volume_buttons: list[Button] = [self.volume_button_on, self.volume_button_off]
-        self.music_buttons: list[Button] = [self.music_button_on, self.music_button_off]
         self.current_active_button_ind = 0
         self.buttons_list[self.current_active_button_ind].change_active()
-        self.current_volume_button_ind = 0
-        self.current_music_button_ind = 0
 
         author_sign_part3_rect: pg.Rect = self.author_sign_surf_parts[2].get_rect(
             bottomright=(GAME_SCREEN_WIDTH - 5, GAME_SCREEN_HEIGHT - 5)
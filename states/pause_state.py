@@ -10,11 +10,15 @@ sys.path.append(os.path.dirname(scipt_dir))
 import pygame as pg
 from .base_state import State
 from .menu_button import Button
+from asset_loader import asset_loader
 
 
 class PauseState(State):
+    graphics_folders: tuple[str, ...] = ("pause",)
+
     def __init__(self) -> None:
         super().__init__()
+        self.resumes_previous = True
 
     def update_active_button(self, new_ind: int) -> None:
         self.buttons_list[self.current_active_button_ind].change_active()
@@ -22,11 +26,12 @@ class PauseState(State):
         self.buttons_list[self.current_active_button_ind].change_active()
 
     def load_graphics(self) -> None:
-        self.pause_title: pg.Surface = pg.image.load("assets/graphics/pause/pause_title.png").convert_alpha()
-        self.pause_title = pg.transform.rotozoom(self.pause_title, 0, 0.7)
+        self.pause_title: pg.Surface = asset_loader.load_image("assets/graphics/pause/pause_title.png", 0.7)
+        self.pause_title_bg: pg.Surface = asset_loader.load_image("assets/graphics/pause/title_bg.png", 0.8)
 
-        self.pause_title_bg: pg.Surface = pg.image.load("assets/graphics/pause/title_bg.png").convert_alpha()
-        self.pause_title_bg = pg.transform.rotozoom(self.pause_title_bg, 0, 0.8)
+    def setup(self) -> None:
+        self.load_graphics()
+        self.setup_rects_and_buttons()
 
     def setup_rects_and_buttons(self) -> None:
         self.pause_title_bg_rect: pg.Rect = self.pause_title_bg.get_rect(center=(721, 150))